@@ -2,14 +2,17 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
 import requests
 import jwt
+import logging
 import os
+import threading
+import time
 import dotenv
 dotenv.load_dotenv()
 from jwt import InvalidTokenError, ExpiredSignatureError
-from .models import AppUser
-from .storage import SupabaseBucketManager
+from .provisioning import provision_app_user
+from .user_cache import get_cached_app_user
 
-supabase_bucket_manager = SupabaseBucketManager.from_env("image_assets")
+logger = logging.getLogger(__name__)
 
 """
 Token validation functions
@@ -18,21 +21,103 @@ SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 SUPABASE_PROJECT_ID = os.getenv("SUPABASE_PROJECT_ID")
 SUPABASE_ISSUER = f"https://{SUPABASE_PROJECT_ID}.supabase.co/auth/v1"
 JWKS_URL = f"{SUPABASE_ISSUER}/.well-known/jwks.json"
-_JWKS_CACHE = None
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "600"))
+JWKS_REFETCH_MIN_INTERVAL = float(os.getenv("JWKS_REFETCH_MIN_INTERVAL", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
 
 
-def get_public_key(kid: str):
+class JWKSCache:
     """
-    Fetch the public key from Supabase JWKS for a given key ID.
+    Parsed Supabase signing keys by `kid`.
+
+    - Keys are parsed once per fetch, so requests only do a dict lookup.
+    - Past `ttl` the current keys keep being served while one background
+      thread refreshes them; only the very first fetch blocks.
+    - An unknown `kid` (key rotation) triggers a blocking refetch, at most once
+      per `min_refetch_interval`, so forged kids cannot hammer the JWKS endpoint.
+      Until a fetch has succeeded there is nothing to serve, so every lookup
+      retries (still one fetch at a time).
+    - A failed fetch keeps the previous keys.
     """
-    global _JWKS_CACHE
-    if _JWKS_CACHE is None:
-        _JWKS_CACHE = requests.get(JWKS_URL).json()
 
-    for key in _JWKS_CACHE["keys"]:
-        if key["kid"] == kid:
-            return jwt.algorithms.ECAlgorithm.from_jwk(key)
-    raise ValueError(f"Public key not found for kid={kid}")
+    def __init__(self, url: str, ttl: float, min_refetch_interval: float, timeout: float):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._keys = {}
+        self._fetched_at = None
+        self._last_attempt = float("-inf")
+        self._lock = threading.Lock()
+        # Guards only `_refreshing`; `_lock` is held for a whole fetch.
+        self._refreshing_lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            jwks = response.json()
+            keys = {
+                key["kid"]: jwt.algorithms.ECAlgorithm.from_jwk(key)
+                for key in jwks.get("keys", [])
+                if key.get("kid")
+            }
+        except Exception:
+            logger.warning("Failed to refresh JWKS from %s", self.url, exc_info=True)
+            return
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            with self._lock:
+                self._fetch()
+        finally:
+            with self._refreshing_lock:
+                self._refreshing = False
+
+    def _start_background_refresh(self) -> None:
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def get(self, kid: str):
+        key = self._keys.get(kid)
+        if key is not None:
+            if time.monotonic() - self._fetched_at > self.ttl and not self._refreshing:
+                self._start_background_refresh()
+            return key
+
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is None and (
+                self._fetched_at is None
+                or time.monotonic() - self._last_attempt >= self.min_refetch_interval
+            ):
+                self._fetch()
+                key = self._keys.get(kid)
+        if key is None:
+            raise ValueError(f"Public key not found for kid={kid}")
+        return key
+
+
+_JWKS_CACHE = JWKSCache(
+    JWKS_URL,
+    ttl=JWKS_CACHE_TTL,
+    min_refetch_interval=JWKS_REFETCH_MIN_INTERVAL,
+    timeout=JWKS_FETCH_TIMEOUT,
+)
+
+
+def get_public_key(kid: str):
+    """
+    Return the parsed public key from Supabase JWKS for a given key ID.
+    """
+    return _JWKS_CACHE.get(kid)
 
 def validate_access_token(token: str) -> dict:
     """
@@ -87,36 +172,9 @@ class SupabaseJWTAuthentication(BaseAuthentication):
 
         try:
             payload = validate_access_token(token)
-            try:
-                user = AppUser.objects.get(supabase_uid=payload["sub"])
-            except AppUser.DoesNotExist:
-                email = payload['email']
-                user_metadata = payload.get("user_metadata", {})
-                name = (
-                    user_metadata.get("full_name")
-                    or user_metadata.get("name")
-                    or user_metadata.get("preferred_username")
-                    or ""
-                )
-                role = "user"
-                tokens = 50
-                default_image_url = "https://images.pexels.com/photos/1043471/pexels-photo-1043471.jpeg"
-                info_prompt = "A man standing with jacket on his hand and his handsome."
-                image_bytes = requests.get(default_image_url).content
-                uploaded_image_url = supabase_bucket_manager.store_bytes(image_bytes, f"/profile/{payload['sub']}.jpg")
-                app_user_defaults = {
-                    "supabase_uid": payload["sub"],
-                    "name":name,
-                    "tokens": tokens,
-                    "info_prompt": info_prompt,
-                    "base_image_path": uploaded_image_url,
-                    "email": email,
-                    "role": role,
-                }
-                user, created = AppUser.objects.update_or_create(
-                    id=payload["sub"],
-                    defaults=app_user_defaults,
-                )
+            user = get_cached_app_user(payload["sub"])
+            if user is None:
+                user = provision_app_user(payload)
             return (user, token)
         except ValueError as e:
             raise exceptions.AuthenticationFailed(str(e))
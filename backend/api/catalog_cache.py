@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import CatalogMetadata
+
+logger = logging.getLogger(__name__)
+
+# CatalogMetadata row bumped by every catalog write (see data-ingestor ProductManager).
+CATALOG_VERSION_KEY = "catalog_version"
+CATALOG_VERSION_CACHE_KEY = "catalog:version"
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "300"))
+# How long a process trusts its copy of the version; bounds staleness after an ingest.
+CATALOG_VERSION_TTL = int(os.getenv("CATALOG_VERSION_TTL", "15"))
+
+
+def _parse_version(value) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return 0
+
+
+def get_catalog_version() -> int:
+    """Current catalog version, read from CatalogMetadata at most once per CATALOG_VERSION_TTL."""
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        value = (
+            CatalogMetadata.objects.filter(key=CATALOG_VERSION_KEY)
+            .values_list("value", flat=True)
+            .first()
+        )
+        version = _parse_version(value)
+        cache.set(CATALOG_VERSION_CACHE_KEY, version, CATALOG_VERSION_TTL)
+    return version
+
+
+def bump_catalog_version() -> int:
+    """Invalidate every cached catalog response. Use after catalog writes made from Django."""
+    with transaction.atomic():
+        metadata, _created = CatalogMetadata.objects.select_for_update().get_or_create(
+            key=CATALOG_VERSION_KEY,
+            defaults={"value": 0},
+        )
+        metadata.value = _parse_version(metadata.value) + 1
+        metadata.save(update_fields=["value", "updated_at"])
+    cache.delete(CATALOG_VERSION_CACHE_KEY)
+    return metadata.value
+
+
+def _normalized_params(request) -> list:
+    params = []
+    for name, values in request.query_params.lists():
+        for value in values:
+            if name == "category_ids":
+                value = ",".join(sorted({cid.strip() for cid in value.split(",") if cid.strip()}))
+            params.append((name, value))
+    return sorted(params)
+
+
+def catalog_cache_key(request, scope: str, version: int) -> str:
+    # Host is part of the key because paginated payloads embed absolute next/previous URLs.
+    raw = json.dumps([request.get_host(), request.path, _normalized_params(request)])
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"catalog:{version}:{scope}:{digest}"
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match uses weak comparison.
+    return "*" in etags or any(value.removeprefix("W/") == etag for value in etags)
+
+
+def cached_catalog_response(
+    request,
+    scope: str,
+    build: Callable[[], Response],
+    timeout: int = CATALOG_CACHE_TIMEOUT,
+) -> Response:
+    """
+    Serve a catalog GET from the cache, falling back to `build()` on a miss.
+
+    Entries are keyed on the catalog version and the normalized query params,
+    so an ingest bumping the version retires every entry at once. Data that
+    changes without a version bump needs a shorter `timeout`. Responses
+    carry a strong ETag and a matching If-None-Match yields 304.
+    """
+    version = get_catalog_version()
+    key = catalog_cache_key(request, scope, version)
+    entry = cache.get(key)
+
+    if entry is None:
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        body = JSONRenderer().render(response.data)
+        entry = {
+            "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            "data": json.loads(body),
+        }
+        try:
+            cache.set(key, entry, timeout)
+        except Exception as exc:
+            logger.warning("Failed to cache catalog response %s: %s", key, exc)
+
+    if _etag_matches(request, entry["etag"]):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(entry["data"])
+    response["ETag"] = entry["etag"]
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
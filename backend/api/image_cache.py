@@ -0,0 +1,203 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ImageFetchCache:
+    """
+    Disk-backed, size-bounded LRU cache for images fetched over HTTP.
+
+    - Entries are keyed by URL (plus the downscale setting) and remember the
+      origin's ETag/Last-Modified.
+    - Within `fresh_seconds` an entry is served without touching the network;
+      after that it is revalidated with a conditional GET, so an unchanged
+      image costs a 304 instead of a full download.
+    - Images larger than `max_dimension` are downscaled and re-encoded as JPEG
+      when Pillow is installed.
+    - Least recently used files are evicted once the directory exceeds `max_bytes`.
+
+    Writes go through a temp file and `os.replace`, so several threads or
+    processes can share one directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        *,
+        fresh_seconds: int = 300,
+        max_dimension: int = 0,
+        timeout: float = 10,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.max_dimension = max_dimension
+        self.timeout = timeout
+        self._evict_lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ImageFetchCache":
+        return cls(
+            directory=os.environ.get(
+                "IMAGE_CACHE_DIR",
+                os.path.join(tempfile.gettempdir(), "wearlytic-image-cache"),
+            ),
+            max_bytes=int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+            fresh_seconds=int(os.environ.get("IMAGE_CACHE_FRESH_SECONDS", "300")),
+            max_dimension=int(os.environ.get("IMAGE_MAX_DIMENSION", "1024")),
+            timeout=float(os.environ.get("IMAGE_FETCH_TIMEOUT", "10")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(f"{url}|{self.max_dimension}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.img", f"{base}.json"
+
+    def fetch(self, url: str) -> bytes:
+        """Return the (possibly downscaled) image at `url`, from cache when possible."""
+        if not self.enabled:
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return self.prepare(response.content)
+
+        data_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        data = self._read_bytes(data_path) if meta else None
+
+        if data is not None and time.time() - meta.get("validated_at", 0) < self.fresh_seconds:
+            self._touch(data_path)
+            return data
+
+        headers = {}
+        if data is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and data is not None:
+            meta["validated_at"] = time.time()
+            self._write_file(meta_path, json.dumps(meta).encode("utf-8"))
+            self._touch(data_path)
+            return data
+        response.raise_for_status()
+
+        data = self.prepare(response.content)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "validated_at": time.time(),
+        }
+        try:
+            self._write_file(data_path, data)
+            self._write_file(meta_path, json.dumps(meta).encode("utf-8"))
+            self._evict()
+        except OSError:
+            logger.warning("Failed to cache image %s", url, exc_info=True)
+        return data
+
+    def prepare(self, content: bytes) -> bytes:
+        """Downscale to `max_dimension` and re-encode as JPEG; unchanged if not needed or possible."""
+        if not self.max_dimension or Image is None:
+            return content
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                if max(image.size) <= self.max_dimension and image.format == "JPEG":
+                    return content
+                image.thumbnail((self.max_dimension, self.max_dimension))
+                output = io.BytesIO()
+                image.convert("RGB").save(output, format="JPEG", quality=90)
+                return output.getvalue()
+        except Exception:
+            logger.warning("Could not downscale image; using original bytes", exc_info=True)
+            return content
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path, "rb") as meta_file:
+                return json.loads(meta_file.read())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _read_bytes(data_path: str) -> Optional[bytes]:
+        try:
+            with open(data_path, "rb") as data_file:
+                return data_file.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write_file(self, path: str, content: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self) -> None:
+        """Drop least recently used images until the directory fits in `max_bytes`."""
+        with self._evict_lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as scanner:
+                for entry in scanner:
+                    if not entry.name.endswith(".img"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _mtime, size, path in sorted(entries):
+                for victim in (path, path[: -len(".img")] + ".json"):
+                    try:
+                        os.unlink(victim)
+                    except OSError:
+                        pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+image_fetch_cache = ImageFetchCache.from_env()
@@ -0,0 +1,320 @@
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .image_cache import image_fetch_cache
+from .models import ImageGeneration, ImageGenerationTask, Product
+from .storage import SupabaseBucketManager
+from .utils import ImageGenerationBusy, generate_ai_product_image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", "4"))
+
+
+def _image_generation_mode() -> str:
+    """
+    "worker" (default) leaves tasks to process_image_tasks; "thread" runs them
+    on a small in-process pool, which only long-lived servers can keep alive.
+    """
+    mode = os.getenv("IMAGE_GENERATION_MODE", "worker")
+    if mode == "thread" and os.getenv("VERCEL"):
+        # Serverless functions are frozen once the response is sent.
+        logger.warning("IMAGE_GENERATION_MODE=thread is not supported on Vercel; using worker mode")
+        return "worker"
+    return mode
+
+
+IMAGE_GENERATION_MODE = _image_generation_mode()
+IMAGE_GENERATION_THREADS = int(os.getenv("IMAGE_GENERATION_THREADS", "2"))
+# Seconds a task turned away by the Gemini limiter waits before it can be claimed again.
+IMAGE_GENERATION_RETRY_DELAY = float(os.getenv("IMAGE_GENERATION_RETRY_DELAY", "5"))
+# Minutes after which a task still processing is taken to be abandoned by a crashed or restarted process.
+IMAGE_TASK_STALE_MINUTES = int(os.getenv("IMAGE_TASK_STALE_MINUTES", "30"))
+# PostgreSQL LISTEN/NOTIFY channel process_image_tasks waits on.
+IMAGE_TASK_CHANNEL = "image_generation_tasks"
+
+supabase_bucket_manager = SupabaseBucketManager.from_env("image_assets")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class ImageGenerationError(Exception):
+    """A task cannot be processed; the message is safe to log."""
+
+
+def fetch_image(url: str) -> bytes:
+    return image_fetch_cache.fetch(url)
+
+
+def generation_fingerprint(base_image_path: str, product_ids, prompt: str) -> str:
+    """
+    Identity of a generation request: same base image, products and prompt give the same value.
+
+    The base image is identified by its URL, which carries a content hash
+    (`versioned_url()`) set at upload time, so no download is needed.
+    """
+    normalized_prompt = " ".join(prompt.casefold().split())
+    digest = hashlib.sha256()
+    digest.update(base_image_path.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(",".join(sorted(str(product_id) for product_id in product_ids)).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalized_prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fetch_task_images(task: ImageGenerationTask) -> Tuple[bytes, List[bytes]]:
+    """Download the creator's base image and every product image concurrently."""
+    base_image_path = task.get_base_image_path()
+    if not base_image_path:
+        raise ImageGenerationError("Creator has no base image")
+
+    image_urls = dict(
+        Product.objects.filter(id__in=task.product_ids).values_list("id", "image_url")
+    )
+    missing = [str(product_id) for product_id in task.product_ids if product_id not in image_urls]
+    if missing:
+        raise ImageGenerationError(f"Unknown product ids: {', '.join(missing)}")
+
+    urls = [base_image_path] + [image_urls[product_id] for product_id in task.product_ids]
+    with ThreadPoolExecutor(max_workers=max(1, min(IMAGE_FETCH_CONCURRENCY, len(urls)))) as executor:
+        images = list(executor.map(fetch_image, urls))
+    return images[0], images[1:]
+
+
+def _claimable() -> Q:
+    """Pending tasks whose retry backoff, if any, has elapsed."""
+    return Q(status="pending") & (Q(available_at__isnull=True) | Q(available_at__lte=timezone.now()))
+
+
+def claim_task(task_id) -> bool:
+    """Move a task from pending to processing; False if someone else already took it or it is backing off."""
+    return bool(
+        ImageGenerationTask.objects.filter(_claimable(), id=task_id).update(
+            status="processing",
+            updated_at=timezone.now(),
+        )
+    )
+
+
+def claim_pending_tasks(limit: int) -> List[ImageGenerationTask]:
+    """
+    Claim up to `limit` pending tasks, oldest first, and mark them processing.
+    Tasks still backing off after a busy requeue are left alone.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED so concurrent workers each get
+    a disjoint set without waiting on one another.
+    """
+    if limit <= 0:
+        return []
+    with transaction.atomic():
+        task_ids = list(
+            ImageGenerationTask.objects.select_for_update(skip_locked=True)
+            .filter(_claimable())
+            .order_by("created_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        if task_ids:
+            ImageGenerationTask.objects.filter(id__in=task_ids, status="pending").update(
+                status="processing",
+                updated_at=timezone.now(),
+            )
+    return list(ImageGenerationTask.objects.select_related("creator").filter(id__in=task_ids))
+
+
+def seconds_until_next_retry() -> Optional[float]:
+    """Seconds until the earliest backing-off task becomes claimable, or None if none is waiting."""
+    next_at = ImageGenerationTask.objects.filter(
+        status="pending", available_at__gt=timezone.now()
+    ).aggregate(next_at=Min("available_at"))["next_at"]
+    if next_at is None:
+        return None
+    return max(0.0, (next_at - timezone.now()).total_seconds())
+
+
+def requeue_stale_tasks(minutes: int = IMAGE_TASK_STALE_MINUTES) -> int:
+    """Put tasks stuck in processing for more than `minutes` back to pending; 0 disables."""
+    if minutes <= 0:
+        return 0
+    cutoff = timezone.now() - datetime.timedelta(minutes=minutes)
+    return ImageGenerationTask.objects.filter(status="processing", updated_at__lt=cutoff).update(
+        status="pending",
+        updated_at=timezone.now(),
+    )
+
+
+def notify_workers(task_id) -> None:
+    """Wake process_image_tasks listeners; a no-op outside PostgreSQL."""
+    if connection.vendor != "postgresql":
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [IMAGE_TASK_CHANNEL, str(task_id)])
+    except Exception:
+        # Workers still find the task on their next poll.
+        logger.warning("Failed to notify image generation workers", exc_info=True)
+
+
+def _set_status(task: ImageGenerationTask, task_status: str) -> None:
+    task.status = task_status
+    task.save(update_fields=["status", "updated_at"])
+
+
+def _requeue_busy(task: ImageGenerationTask) -> None:
+    """Back to pending, not claimable again until IMAGE_GENERATION_RETRY_DELAY has passed."""
+    task.status = "pending"
+    task.available_at = timezone.now() + datetime.timedelta(seconds=IMAGE_GENERATION_RETRY_DELAY)
+    task.save(update_fields=["status", "available_at", "updated_at"])
+
+
+def process_task(task: ImageGenerationTask) -> Optional[ImageGeneration]:
+    """
+    Generate and store the image for a task already claimed as processing.
+
+    Marks the task completed or failed and never raises. A task turned away by
+    the Gemini concurrency limiter goes back to pending instead of failing.
+    """
+    started = time.monotonic()
+    if task.creator.role != "super_user":
+        logger.warning(
+            "Skipped image generation task: image generation is limited to Super Users",
+            extra={"task_id": str(task.id), "user_id": str(task.creator_id)},
+        )
+        _set_status(task, "failed")
+        return None
+
+    timings = {}
+    try:
+        step_started = time.monotonic()
+        base_image, input_images = fetch_task_images(task)
+        timings["fetch"] = time.monotonic() - step_started
+
+        step_started = time.monotonic()
+        image_bytes = generate_ai_product_image(task.get_full_prompt(), base_image, input_images)
+        timings["generate"] = time.monotonic() - step_started
+
+        step_started = time.monotonic()
+        image_url = supabase_bucket_manager.store_bytes(image_bytes, f"/generations/{task.id}.jpg")
+        timings["upload"] = time.monotonic() - step_started
+        with transaction.atomic():
+            generation = ImageGeneration.objects.create(
+                task=task,
+                creator=task.creator,
+                image=image_url,
+            )
+            _set_status(task, "completed")
+    except ImageGenerationBusy as exc:
+        logger.warning(
+            "Image generation task requeued: %s",
+            exc,
+            extra={"task_id": str(task.id), "user_id": str(task.creator_id)},
+        )
+        _requeue_busy(task)
+        return None
+    except Exception:
+        logger.exception(
+            "Image generation task failed",
+            extra={
+                "task_id": str(task.id),
+                "user_id": str(task.creator_id),
+                "product_count": len(task.product_ids or []),
+                "timings": timings,
+            },
+        )
+        _set_status(task, "failed")
+        return None
+
+    logger.info(
+        "Image generation task completed in %.2fs (fetch %.2fs, generate %.2fs, upload %.2fs)",
+        time.monotonic() - started,
+        timings["fetch"],
+        timings["generate"],
+        timings["upload"],
+        extra={"task_id": str(task.id), "user_id": str(task.creator_id), "timings": timings},
+    )
+    return generation
+
+
+def _run_in_thread(task_id) -> None:
+    close_old_connections()
+    try:
+        if not claim_task(task_id):
+            return
+        task = ImageGenerationTask.objects.select_related("creator").get(id=task_id)
+        process_task(task)
+        if task.status == "pending":
+            timer = threading.Timer(IMAGE_GENERATION_RETRY_DELAY, dispatch_task, args=(task,))
+            timer.daemon = True
+            timer.start()
+    except Exception:
+        logger.exception("Image generation thread crashed", extra={"task_id": str(task_id)})
+    finally:
+        close_old_connections()
+
+
+def dispatch_task(task: ImageGenerationTask) -> None:
+    """
+    Hand a freshly created pending task to the configured executor.
+
+    Call from `transaction.on_commit` so the task row is visible to the executor.
+    """
+    if IMAGE_GENERATION_MODE != "thread":
+        notify_workers(task.id)
+        return
+    _submit(task.id)
+
+
+def _submit(task_id) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=IMAGE_GENERATION_THREADS,
+                thread_name_prefix="image-generation",
+            )
+    _executor.submit(_run_in_thread, task_id)
+
+
+def recover_tasks() -> None:
+    """
+    Pick up thread-mode tasks left behind by a previous process.
+
+    Thread mode keeps queued work only in the process's pool, so anything
+    pending or processing at a restart or deploy would never run. Stale
+    processing tasks go back to pending and every pending task is submitted,
+    those still backing off once their `available_at` has passed;
+    `claim_task` keeps several processes from running the same one.
+    """
+    close_old_connections()
+    try:
+        requeued = requeue_stale_tasks()
+        pending = list(
+            ImageGenerationTask.objects.filter(status="pending")
+            .order_by("created_at")
+            .values_list("id", "available_at")
+        )
+        now = timezone.now()
+        for task_id, available_at in pending:
+            if available_at is not None and available_at > now:
+                timer = threading.Timer((available_at - now).total_seconds(), _submit, args=(task_id,))
+                timer.daemon = True
+                timer.start()
+            else:
+                _submit(task_id)
+        if requeued or pending:
+            logger.info("Recovered image generation tasks: %s requeued, %s dispatched", requeued, len(pending))
+    except Exception:
+        logger.exception("Image generation task recovery failed")
+    finally:
+        close_old_connections()
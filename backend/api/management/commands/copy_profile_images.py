@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.provisioning import copy_default_profile_images
+
+
+class Command(BaseCommand):
+    help = "Upload a per-user copy of the default profile image for every user still on the shared one"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Users uploaded concurrently per batch (bounded by SUPABASE_UPLOAD_CONCURRENCY).",
+        )
+
+    def handle(self, *args, **options):
+        copied = copy_default_profile_images(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(f"Copied the default profile image for {copied} user(s).")
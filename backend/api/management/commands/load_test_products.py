@@ -0,0 +1,91 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the products list endpoint of a running server. Run it once "
+        "with DB_CONN_MAX_AGE=0 and once with the default persistent connections "
+        "to compare per-request database connection cost."
+    )
+    # Only talks HTTP to another process; no need to load this project's URLs.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000/api/products/",
+            help="Products list URL to request.",
+        )
+        parser.add_argument("--requests", type=int, default=200, help="Total requests to send.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once.")
+        parser.add_argument(
+            "--param",
+            action="append",
+            default=[],
+            metavar="KEY=VALUE",
+            help="Extra query parameter, e.g. --param page_size=20. Repeatable.",
+        )
+        parser.add_argument(
+            "--use-cache",
+            action="store_true",
+            help="Let responses come from the catalog cache. By default every request "
+            "carries a unique parameter so it reaches the database.",
+        )
+
+    def handle(self, *args, **options):
+        total = max(1, options["requests"])
+        concurrency = max(1, options["concurrency"])
+        params = []
+        for item in options["param"]:
+            if "=" not in item:
+                raise CommandError(f"--param must be KEY=VALUE, got {item!r}")
+            params.append(tuple(item.split("=", 1)))
+
+        run_id = uuid.uuid4().hex[:8]
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+        def send(index: int):
+            query = list(params)
+            if not options["use_cache"]:
+                query.append(("_load_test", f"{run_id}-{index}"))
+            url = f"{options['url']}?{urlencode(query)}" if query else options["url"]
+            started = time.monotonic()
+            try:
+                response = session.get(url, timeout=30)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            return ok, time.monotonic() - started
+
+        # One warm-up request so server start-up does not skew the numbers.
+        send(-1)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, range(total)))
+        elapsed = time.monotonic() - started
+
+        latencies = sorted(duration for ok, duration in results if ok)
+        errors = sum(1 for ok, _duration in results if not ok)
+        self.stdout.write(f"{total} requests, concurrency {concurrency}, {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+        if not latencies:
+            raise CommandError(f"All {errors} requests failed")
+        self.stdout.write(
+            "latency "
+            f"p50={_percentile(latencies, 0.50) * 1000:.1f}ms "
+            f"p95={_percentile(latencies, 0.95) * 1000:.1f}ms "
+            f"p99={_percentile(latencies, 0.99) * 1000:.1f}ms "
+            f"max={latencies[-1] * 1000:.1f}ms "
+            f"errors={errors}"
+        )
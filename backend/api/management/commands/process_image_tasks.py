@@ -1,50 +1,254 @@
 import logging
+import os
+import select
+import signal
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from django.core.management.base import BaseCommand
-from api.models import ImageGenerationTask, ImageGeneration
-from api.utils import generate_ai_product_image
+from django.db import InterfaceError, OperationalError, close_old_connections, connection
+
+from api.image_generation import (
+    IMAGE_TASK_CHANNEL,
+    IMAGE_TASK_STALE_MINUTES,
+    claim_pending_tasks,
+    process_task,
+    requeue_stale_tasks,
+    seconds_until_next_retry,
+)
+from api.utils import get_image_generation_metrics
 
 logger = logging.getLogger(__name__)
 
+# Ceiling for the doubling backoff after database errors, in seconds.
+MAX_RETRY_BACKOFF = 60.0
+
+
+def _listen_connection_params() -> dict:
+    """
+    Connection parameters for the LISTEN session.
+
+    LISTEN registrations live on a server session, which a transaction-mode
+    pooler (PgBouncer, Supabase port 6543) hands to other clients between
+    statements, so notifications would never arrive. `DB_LISTEN_URL` names a
+    direct or session-mode DSN; without it a PgBouncer database is reached on
+    `DB_LISTEN_PORT` (default 5432, Supabase's session-mode port) instead.
+    """
+    listen_url = os.getenv("DB_LISTEN_URL")
+    if listen_url:
+        return {"dsn": listen_url}
+    params = connection.get_connection_params()
+    if connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        params["port"] = os.getenv("DB_LISTEN_PORT", "5432")
+    return params
+
+
+class TaskListener:
+    """
+    Blocks until a task is queued (LISTEN/NOTIFY) or the timeout elapses.
+
+    Uses its own autocommit session-mode connection (see
+    `_listen_connection_params`) so notifications are delivered while the
+    worker threads use theirs. Outside PostgreSQL it just sleeps.
+
+    A lost connection is dropped and reopened on a later wait, backing off
+    up to MAX_RETRY_BACKOFF between attempts; meanwhile it sleeps and the
+    worker falls back to polling.
+    """
+
+    def __init__(self):
+        self._enabled = connection.vendor == "postgresql"
+        self._connection = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def _open(self) -> None:
+        import psycopg2
+
+        try:
+            self._connection = psycopg2.connect(**_listen_connection_params())
+            self._connection.set_session(autocommit=True)
+            with self._connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {IMAGE_TASK_CHANNEL}")
+        except psycopg2.Error:
+            self._drop("Could not open the image task listener")
+            return
+        self._failures = 0
+
+    def _drop(self, message: str) -> None:
+        self.close()
+        self._failures += 1
+        delay = min(MAX_RETRY_BACKOFF, 2.0 ** self._failures)
+        self._retry_at = time.monotonic() + delay
+        logger.warning("%s; retrying in %.0fs", message, delay, exc_info=True)
+
+    def wait(self, timeout: float, stop: threading.Event) -> None:
+        import psycopg2
+
+        deadline = time.monotonic() + timeout
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Short slices keep shutdown responsive.
+            slice_timeout = min(remaining, 1.0)
+            if self._connection is None and self._enabled and time.monotonic() >= self._retry_at:
+                self._open()
+                if self._connection is not None:
+                    # Notifications sent while disconnected were lost; let the worker claim.
+                    return
+            if self._connection is None:
+                stop.wait(slice_timeout)
+                continue
+            try:
+                readable, _, _ = select.select([self._connection], [], [], slice_timeout)
+                if readable:
+                    self._connection.poll()
+            except (psycopg2.Error, OSError, ValueError):
+                self._drop("Image task listener connection lost")
+                return
+            if readable and self._connection.notifies:
+                self._connection.notifies.clear()
+                return
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class TaskStats:
+    """Running per-task timings, logged periodically and on shutdown."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.durations = []
+
+    def record(self, ok: bool, duration: float) -> None:
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.durations.append(duration)
+            # Bounded window for the percentiles.
+            del self.durations[:-500]
+
+    def summary(self) -> str:
+        with self._lock:
+            durations = sorted(self.durations)
+            completed, failed = self.completed, self.failed
+        if not durations:
+            return f"completed={completed} failed={failed}"
+        p50 = durations[len(durations) // 2]
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        return f"completed={completed} failed={failed} p50={p50:.2f}s p95={p95:.2f}s max={durations[-1]:.2f}s"
+
+
 class Command(BaseCommand):
     help = "Process image generation tasks"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=int(os.getenv("IMAGE_GENERATION_THREADS", "2")),
+            help="Tasks processed at once.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=30.0,
+            help="Seconds between fallback polls when no notification arrives.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=IMAGE_TASK_STALE_MINUTES,
+            help="Minutes after which a task stuck in processing is put back to pending on startup.",
+        )
+
     def handle(self, *args, **options):
-        while True:
-            pending_tasks = ImageGenerationTask.objects.filter(status="pending").select_related("creator")
-            for task in pending_tasks:
-                if task.creator.role != "super_user":
-                    task.status = "failed"
-                    task.save(update_fields=["status"])
-                    self.stdout.write(
-                        f"Skipped image generation task {task.id}: image generation is limited to Super Users."
-                    )
-                    continue
-
-                task.status = "processing"
-                task.save(update_fields=["status"])
-
-                try:
-                    image_url = generate_ai_product_image(task.get_full_prompt(), [])
-
-                    ImageGeneration.objects.create(
-                        task=task,
-                        creator=task.creator,
-                        image=image_url
-                    )
-
-                    task.status = "completed"
-                except Exception:
-                    logger.exception(
-                        "Queued image generation task failed",
-                        extra={
-                            "task_id": str(task.id),
-                            "user_id": str(task.creator_id),
-                            "product_count": len(task.product_ids or []),
-                        },
-                    )
-                    task.status = "failed"
-
-                task.save(update_fields=["status"])
-
-            time.sleep(2)
+        concurrency = max(1, options["concurrency"])
+        stop = threading.Event()
+        stats = TaskStats()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Shutdown requested; finishing in-flight tasks.")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        self._requeue_stale(options["stale_after"])
+        listener = TaskListener()
+        in_flight = set()
+        last_summary = time.monotonic()
+        failures = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-task") as executor:
+            try:
+                while not stop.is_set():
+                    done = {future for future in in_flight if future.done()}
+                    in_flight -= done
+
+                    try:
+                        # Honours CONN_MAX_AGE and drops connections broken by an earlier error.
+                        close_old_connections()
+                        for task in claim_pending_tasks(concurrency - len(in_flight)):
+                            in_flight.add(executor.submit(self._run_task, task, stats))
+                        idle_timeout = self._idle_timeout(options["poll_interval"])
+                        failures = 0
+                    except (OperationalError, InterfaceError):
+                        failures += 1
+                        delay = min(MAX_RETRY_BACKOFF, 2.0 ** failures)
+                        logger.warning("Image task worker lost its database connection; retrying in %.0fs", delay, exc_info=True)
+                        close_old_connections()
+                        stop.wait(delay)
+                        continue
+
+                    if time.monotonic() - last_summary >= 300:
+                        self.stdout.write(f"Image tasks: {stats.summary()}")
+                        self.stdout.write(f"Gemini calls: {get_image_generation_metrics()}")
+                        last_summary = time.monotonic()
+
+                    if len(in_flight) >= concurrency:
+                        wait(in_flight, timeout=1.0, return_when=FIRST_COMPLETED)
+                    else:
+                        listener.wait(idle_timeout, stop)
+            finally:
+                listener.close()
+                # Leaving the with-block waits for in-flight tasks.
+
+        self.stdout.write(f"Image task worker stopped: {stats.summary()}")
+
+    def _idle_timeout(self, poll_interval: float) -> float:
+        """Sleep until the next poll, or sooner if a busy-requeued task becomes claimable first."""
+        retry_in = seconds_until_next_retry()
+        if retry_in is None:
+            return poll_interval
+        return min(poll_interval, retry_in)
+
+    def _requeue_stale(self, minutes: int) -> None:
+        requeued = requeue_stale_tasks(minutes)
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale image generation task(s).")
+
+    def _run_task(self, task, stats: TaskStats) -> None:
+        close_old_connections()
+        started = time.monotonic()
+        try:
+            generation = process_task(task)
+            stats.record(generation is not None, time.monotonic() - started)
+            self.stdout.write(f"Image generation task {task.id}: {task.status} in {time.monotonic() - started:.2f}s")
+        except Exception:
+            stats.record(False, time.monotonic() - started)
+            logger.exception("Image generation task crashed", extra={"task_id": str(task.id)})
+        finally:
+            close_old_connections()
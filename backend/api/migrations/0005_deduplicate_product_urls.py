@@ -0,0 +1,49 @@
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import migrations
+
+
+def normalize_product_url(url):
+    # Keep in sync with data-ingestor/app/db/product.py::normalize_product_url.
+    value = str(url or "").strip()
+    parts = urlsplit(value)
+    if not parts.scheme or not parts.netloc:
+        return value
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def deduplicate_products(apps, schema_editor):
+    product = apps.get_model("api", "Product")
+    image_generation_task = apps.get_model("api", "ImageGenerationTask")
+
+    keepers = {}
+    replacements = {}
+    for product_id, url in product.objects.order_by("id").values_list("id", "url").iterator():
+        normalized_url = normalize_product_url(url)
+        keeper_id = keepers.setdefault(normalized_url, product_id)
+        if keeper_id != product_id:
+            replacements[product_id] = keeper_id
+        elif normalized_url != url:
+            product.objects.filter(id=product_id).update(url=normalized_url)
+
+    if not replacements:
+        return
+
+    for task in image_generation_task.objects.exclude(product_ids=[]).iterator():
+        product_ids = list(dict.fromkeys(replacements.get(pid, pid) for pid in task.product_ids))
+        if product_ids != task.product_ids:
+            task.product_ids = product_ids
+            task.save(update_fields=["product_ids"])
+
+    product.objects.filter(id__in=list(replacements)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_catalogmetadata"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_products, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def seed_catalog_metadata(apps, schema_editor):
+    # The data-ingestor maintains these rows incrementally from here on.
+    catalog_metadata = apps.get_model("api", "CatalogMetadata")
+    product = apps.get_model("api", "Product")
+
+    catalog_metadata.objects.update_or_create(
+        key="total_products",
+        defaults={"value": product.objects.count()},
+    )
+    catalog_metadata.objects.get_or_create(
+        key="last_fetched",
+        defaults={"value": timezone.now().isoformat()},
+    )
+    catalog_metadata.objects.get_or_create(
+        key="catalog_version",
+        defaults={"value": 0},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_product_api_product_url_uniq"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_catalog_metadata, migrations.RunPython.noop),
+    ]
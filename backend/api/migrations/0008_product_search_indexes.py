@@ -0,0 +1,39 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Kept out of Product.Meta because they are PostgreSQL-only and local
+# development can fall back to SQLite. The tsvector expression must match
+# PRODUCT_SEARCH_VECTOR in api/views.py.
+SEARCH_INDEXES = [
+    GinIndex(SearchVector("title", config="english"), name="api_product_title_fts_idx"),
+    GinIndex(fields=["title"], opclasses=["gin_trgm_ops"], name="api_product_title_trgm_idx"),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    product = apps.get_model("api", "Product")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(product, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    product = apps.get_model("api", "Product")
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(product, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_seed_catalog_metadata"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
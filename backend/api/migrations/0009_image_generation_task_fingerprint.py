@@ -0,0 +1,26 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_product_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagegenerationtask',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of base image, sorted product ids and normalized prompt; used to deduplicate requests', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='imagegenerationtask',
+            index=models.Index(fields=['creator', 'fingerprint'], name='api_imagege_creator_e926fe_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='imagegenerationtask',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'processing']), models.Q(('fingerprint', ''), _negated=True)), fields=('creator', 'fingerprint'), name='api_imagetask_inflight_uniq'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:37
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Keep in sync with CATEGORY_HISTOGRAM_BUCKETS in data-ingestor/app/db/product.py.
+HISTOGRAM_BUCKETS = 10
+
+
+def seed_category_stats(apps, schema_editor):
+    # The data-ingestor maintains these rows incrementally from here on.
+    category_stats = apps.get_model("api", "CategoryStats")
+    product = apps.get_model("api", "Product")
+
+    prices = defaultdict(list)
+    for category_id, price in product.objects.values_list("category_id", "price").iterator():
+        prices[category_id].append(price)
+
+    rows = []
+    for category_id, values in prices.items():
+        low, high = min(values), max(values)
+        bucket_count = HISTOGRAM_BUCKETS if high > low else 1
+        width = (high - low) / bucket_count
+        counts = [0] * bucket_count
+        for value in values:
+            index = int((value - low) / width) if width else 0
+            counts[min(index, bucket_count - 1)] += 1
+        rows.append(category_stats(
+            category_id=category_id,
+            product_count=len(values),
+            min_price=low,
+            max_price=high,
+            price_histogram=[
+                {"min": low + width * i, "max": high if i == bucket_count - 1 else low + width * (i + 1), "count": count}
+                for i, count in enumerate(counts)
+            ],
+        ))
+    category_stats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_image_generation_task_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.category')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.FloatField(blank=True, null=True)),
+                ('max_price', models.FloatField(blank=True, null=True)),
+                ('price_histogram', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_category_stats, migrations.RunPython.noop),
+    ]
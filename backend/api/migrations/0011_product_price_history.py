@@ -0,0 +1,40 @@
+# Generated by Django 5.0.9 on 2026-10-19 12:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_category_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ProductPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.FloatField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='api.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-recorded_at'], name='api_pricehist_product_idx')],
+            },
+        ),
+        # Baseline row per product so the first change has something to compare against.
+        migrations.RunSQL(
+            """
+            INSERT INTO api_productpricehistory (product_id, price, recorded_at)
+            SELECT id, price, CURRENT_TIMESTAMP FROM api_product
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_product_price_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagegenerationtask',
+            name='available_at',
+            field=models.DateTimeField(blank=True, help_text='Earliest time a requeued pending task may be claimed again; null means immediately', null=True),
+        ),
+    ]
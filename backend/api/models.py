@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField 
 
 class AppUser(models.Model):
@@ -54,6 +55,8 @@ class Product(models.Model):
     url = models.URLField()
     image_url = models.URLField()
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="products")
+    # sha256 of the scraped fields, set by the data-ingestor; an unchanged scrape skips the UPDATE.
+    content_hash = models.CharField(max_length=64, blank=True, default="")
 
     def __str__(self) -> str:
         return f"{self.title} ({self.id})"
@@ -63,6 +66,56 @@ class Product(models.Model):
             models.Index(fields=["price"]),
             models.Index(fields=["category", "price"]),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=["url"], name="api_product_url_uniq"),
+        ]
+
+
+class ProductPriceHistory(models.Model):
+    """Append-only price log; the data-ingestor adds a row only when a product's price changes."""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_history",
+        db_index=False,
+    )
+    price = models.FloatField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Also serves lookups by product alone.
+            models.Index(fields=["product", "-recorded_at"], name="api_pricehist_product_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.price} at {self.recorded_at}"
+
+
+class CategoryStats(models.Model):
+    """
+    Per-category product count, price bounds and price histogram.
+
+    Maintained by the data-ingestor: every product write applies count and
+    price-bound deltas to the categories it touched, and `reconcile_stats`
+    rebuilds every row, histogram included, hourly.
+    `price_histogram` holds equal-width buckets between min and max price as
+    ``[{"min": ..., "max": ..., "count": ...}, ...]``.
+    """
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    product_count = models.PositiveIntegerField(default=0)
+    min_price = models.FloatField(null=True, blank=True)
+    max_price = models.FloatField(null=True, blank=True)
+    price_histogram = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.category_id}: {self.product_count} products"
 
 
 class CatalogMetadata(models.Model):
@@ -100,6 +153,30 @@ class ImageGenerationTask(models.Model):
         ),
         default="pending"
     )
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of base image, sorted product ids and normalized prompt; used to deduplicate requests"
+    )
+    available_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Earliest time a requeued pending task may be claimed again; null means immediately"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["creator", "fingerprint"]),
+        ]
+        constraints = [
+            # At most one in-flight task per identical request (single-flight).
+            models.UniqueConstraint(
+                fields=["creator", "fingerprint"],
+                condition=models.Q(status__in=["pending", "processing"]) & ~models.Q(fingerprint=""),
+                name="api_imagetask_inflight_uniq",
+            ),
+        ]
     
     def get_full_prompt(self):
         base_prompt = self.creator.info_prompt or ""
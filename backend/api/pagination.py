@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+	"""
+	Keyset (cursor) pagination over a queryset ordered by ``(key_field, id)``.
+
+	Each page is a range scan that starts after the last row of the previous
+	page, so deep pages cost the same as the first one and no ``COUNT(*)`` is
+	issued. ``count`` is only filled in when the caller supplies one.
+
+	Query params:
+	- ``cursor``: opaque position returned in ``next``/``previous``.
+	- ``ordering``: ``<key_field>`` or ``-<key_field>`` when ``ordering_query_param`` is set.
+	- ``page_size``: rows per page, capped at ``max_page_size``.
+	"""
+
+	key_field = None
+	descending_by_default = False
+	cursor_query_param = "cursor"
+	ordering_query_param = "ordering"
+	page_size_query_param = "page_size"
+	page_size = 100
+	max_page_size = 300
+	invalid_cursor_message = "Invalid cursor"
+
+	def __init__(self, count=None):
+		self.count = count
+
+	def get_page_size(self, request):
+		try:
+			page_size = int(request.query_params[self.page_size_query_param])
+		except (KeyError, ValueError):
+			return self.page_size
+		if page_size <= 0:
+			return self.page_size
+		return min(page_size, self.max_page_size)
+
+	def get_descending(self, request):
+		if self.ordering_query_param:
+			ordering = request.query_params.get(self.ordering_query_param)
+			if ordering == self.key_field:
+				return False
+			if ordering == f"-{self.key_field}":
+				return True
+		return self.descending_by_default
+
+	def encode_cursor(self, row, reverse):
+		payload = json.dumps(
+			{"k": getattr(row, self.key_field), "i": str(row.id), "r": reverse},
+			separators=(",", ":"),
+		)
+		return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+	def decode_cursor(self, request):
+		encoded = request.query_params.get(self.cursor_query_param)
+		if not encoded:
+			return None
+		try:
+			payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+			return float(payload["k"]), str(payload["i"]), bool(payload.get("r", False))
+		except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+			raise NotFound(self.invalid_cursor_message)
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		self.base_url = request.build_absolute_uri()
+		page_size = self.get_page_size(request)
+
+		cursor = self.decode_cursor(request)
+		reverse = bool(cursor and cursor[2])
+		# Walking backwards is the same range scan with the ordering flipped.
+		scan_descending = self.get_descending(request) != reverse
+		key = self.key_field
+		ordering = (f"-{key}", "-id") if scan_descending else (key, "id")
+
+		if cursor is not None:
+			value, row_id, _ = cursor
+			if scan_descending:
+				queryset = queryset.filter(Q(**{f"{key}__lt": value}) | Q(**{key: value, "id__lt": row_id}))
+			else:
+				queryset = queryset.filter(Q(**{f"{key}__gt": value}) | Q(**{key: value, "id__gt": row_id}))
+
+		rows = list(queryset.order_by(*ordering)[:page_size + 1])
+		has_more = len(rows) > page_size
+		rows = rows[:page_size]
+		if reverse:
+			rows.reverse()
+
+		self.next_cursor = None
+		self.previous_cursor = None
+		if rows:
+			if has_more or reverse:
+				self.next_cursor = self.encode_cursor(rows[-1], reverse=False)
+			if cursor is not None and (has_more or not reverse):
+				self.previous_cursor = self.encode_cursor(rows[0], reverse=True)
+		return rows
+
+	def get_link(self, cursor):
+		if cursor is None:
+			return None
+		return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+	def get_next_link(self):
+		return self.get_link(self.next_cursor)
+
+	def get_previous_link(self):
+		return self.get_link(self.previous_cursor)
+
+	def get_paginated_response(self, data):
+		return Response(OrderedDict([
+			("count", self.count),
+			("next", self.get_next_link()),
+			("previous", self.get_previous_link()),
+			("results", data),
+		]))
+
+
+class ProductKeysetPagination(KeysetPagination):
+	"""Products by ``(price, id)``; ``ordering=-price`` flips the direction."""
+
+	key_field = "price"
+
+
+class ProductSearchPagination(KeysetPagination):
+	"""Search hits by descending ``(score, id)``, where ``score`` is annotated by the view."""
+
+	key_field = "score"
+	descending_by_default = True
+	ordering_query_param = None
@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.db import close_old_connections, transaction
+
+from .image_cache import image_fetch_cache
+from .models import AppUser
+from .storage import SupabaseBucketManager, versioned_url
+from .user_cache import invalidate_app_user
+
+logger = logging.getLogger(__name__)
+
+# New users point at this shared image until their own copy has been uploaded.
+DEFAULT_PROFILE_IMAGE_URL = os.getenv(
+    "DEFAULT_PROFILE_IMAGE_URL",
+    "https://images.pexels.com/photos/1043471/pexels-photo-1043471.jpeg",
+)
+DEFAULT_INFO_PROMPT = "A man standing with jacket on his hand and his handsome."
+
+supabase_bucket_manager = SupabaseBucketManager.from_env("image_assets")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def copy_default_profile_image(user_id) -> None:
+    """
+    Upload a per-user copy of the default profile image and point the user at it.
+
+    The swap only happens while the user still has the shared default, so an
+    image uploaded in the meantime is never overwritten. Failures are logged;
+    the user keeps the shared default.
+    """
+    close_old_connections()
+    try:
+        user = AppUser.objects.filter(id=user_id).only("id", "supabase_uid", "base_image_path").first()
+        if user is None or user.base_image_path != DEFAULT_PROFILE_IMAGE_URL:
+            return
+        image_bytes = image_fetch_cache.fetch(DEFAULT_PROFILE_IMAGE_URL)
+        uploaded_image_url = versioned_url(
+            supabase_bucket_manager.store_bytes(image_bytes, f"/profile/{user.supabase_uid}.jpg"),
+            image_bytes,
+        )
+        updated = AppUser.objects.filter(id=user_id, base_image_path=DEFAULT_PROFILE_IMAGE_URL).update(
+            base_image_path=uploaded_image_url
+        )
+        if updated:
+            # .update() skips the post_save receiver.
+            invalidate_app_user(user.supabase_uid)
+    except Exception:
+        logger.warning("Failed to copy default profile image", extra={"user_id": str(user_id)}, exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def copy_default_profile_images(batch_size: int = 50) -> int:
+    """
+    Give every user still on the shared default image a per-user copy.
+
+    Bulk counterpart of `copy_default_profile_image` for users whose
+    background copy never ran or failed. Each batch is uploaded with
+    `store_many`, then users are repointed with the same conditional update,
+    so an image uploaded meanwhile still wins. Upload errors are raised;
+    uploads upsert, so a rerun picks up where it stopped.
+
+    Returns:
+        int: Number of users repointed.
+    """
+    image_bytes = image_fetch_cache.fetch(DEFAULT_PROFILE_IMAGE_URL)
+    users = (
+        AppUser.objects.filter(base_image_path=DEFAULT_PROFILE_IMAGE_URL)
+        .order_by("id")
+        .values_list("id", "supabase_uid")
+    )
+    copied = 0
+    last_id = None
+    while True:
+        batch = list((users.filter(id__gt=last_id) if last_id else users)[:batch_size])
+        if not batch:
+            return copied
+        urls = supabase_bucket_manager.store_many(
+            [(image_bytes, f"/profile/{supabase_uid}.jpg") for _, supabase_uid in batch]
+        )
+        for (user_id, supabase_uid), url in zip(batch, urls):
+            updated = AppUser.objects.filter(id=user_id, base_image_path=DEFAULT_PROFILE_IMAGE_URL).update(
+                base_image_path=versioned_url(url, image_bytes)
+            )
+            if updated:
+                invalidate_app_user(supabase_uid)
+                copied += updated
+        last_id = batch[-1][0]
+
+
+def schedule_profile_image_copy(user: AppUser) -> None:
+    """Run `copy_default_profile_image` in the background once the user row is committed."""
+    global _executor
+    if user.base_image_path != DEFAULT_PROFILE_IMAGE_URL:
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-image")
+    executor = _executor
+    user_id = user.id
+    transaction.on_commit(lambda: executor.submit(copy_default_profile_image, user_id))
+
+
+def provision_app_user(payload: dict) -> AppUser:
+    """
+    Create the AppUser for a first-seen Supabase token without any network I/O.
+
+    The profile image copy is scheduled in the background.
+    """
+    user_metadata = payload.get("user_metadata", {})
+    name = (
+        user_metadata.get("full_name")
+        or user_metadata.get("name")
+        or user_metadata.get("preferred_username")
+        or ""
+    )
+    app_user_defaults = {
+        "supabase_uid": payload["sub"],
+        "name": name,
+        "tokens": 50,
+        "info_prompt": DEFAULT_INFO_PROMPT,
+        "base_image_path": DEFAULT_PROFILE_IMAGE_URL,
+        "email": payload["email"],
+        "role": "user",
+    }
+    user, created = AppUser.objects.update_or_create(
+        id=payload["sub"],
+        defaults=app_user_defaults,
+    )
+    schedule_profile_image_copy(user)
+    return user
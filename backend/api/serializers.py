@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ImageGenerationTask, ImageGeneration, Product, AppUser, Category
+from .models import ImageGenerationTask, ImageGeneration, Product, AppUser, Category, CategoryStats
 
 
 class AppUserSerializer(serializers.ModelSerializer):
@@ -30,6 +30,13 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class ProductSerializer(serializers.ModelSerializer):
+	"""
+	Product with its nested category.
+
+	Optional kwargs for list views:
+	- ``flat_category``: emit ``category_id`` instead of the nested category.
+	- ``fields``: only emit these fields (sparse fieldset).
+	"""
 	category = CategorySerializer(read_only=True)
 
 	class Meta:
@@ -43,6 +50,29 @@ class ProductSerializer(serializers.ModelSerializer):
 			"category",
 		]
 
+	def __init__(self, *args, fields=None, flat_category=False, **kwargs):
+		super().__init__(*args, **kwargs)
+		if flat_category:
+			self.fields.pop("category")
+			self.fields["category_id"] = serializers.UUIDField(read_only=True)
+		if fields is not None:
+			unknown = set(fields) - set(self.fields)
+			if unknown:
+				raise serializers.ValidationError({
+					"fields": f"Unknown field(s): {', '.join(sorted(unknown))}."
+				})
+			for field_name in set(self.fields) - set(fields):
+				self.fields.pop(field_name)
+
+
+class CategoryStatsSerializer(serializers.ModelSerializer):
+	id = serializers.UUIDField(source="category_id", read_only=True)
+	name = serializers.CharField(source="category.name", read_only=True)
+
+	class Meta:
+		model = CategoryStats
+		fields = ["id", "name", "product_count", "min_price", "max_price", "price_histogram"]
+
 
 class CatalogMetadataSerializer(serializers.Serializer):
     product_count = serializers.IntegerField(min_value=0)
@@ -69,7 +99,11 @@ class ImageGenerationTaskSerializer(serializers.ModelSerializer):
         read_only_fields = ["status", "created_at", "updated_at"]
 
     def get_products(self, obj):
-        products = Product.objects.filter(id__in=obj.product_ids)
+        # list_generations passes every referenced product, serialized once, in context.
+        products_by_id = self.context.get("products_by_id")
+        if products_by_id is not None:
+            return [products_by_id[product_id] for product_id in obj.product_ids if product_id in products_by_id]
+        products = Product.objects.select_related("category").filter(id__in=obj.product_ids)
         return ProductSerializer(products, many=True).data
 
 class ImageGenerationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,40 @@
+import threading
+
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AppUser
+from .user_cache import invalidate_app_user
+
+
+@receiver(post_save, sender=AppUser)
+@receiver(post_delete, sender=AppUser)
+def drop_cached_app_user(sender, instance, **kwargs):
+    invalidate_app_user(instance.supabase_uid)
+
+
+_image_task_recovery_lock = threading.Lock()
+_image_task_recovery_started = False
+
+
+@receiver(request_started)
+def recover_image_tasks_once(sender, **kwargs):
+    """
+    In thread mode, resume image tasks a previous process left pending or
+    processing. Runs once per process, on its first request, in a background
+    thread, so neither app loading (migrate, shell, ...) nor the request
+    itself touches the task table.
+    """
+    global _image_task_recovery_started
+    if _image_task_recovery_started:
+        return
+    with _image_task_recovery_lock:
+        if _image_task_recovery_started:
+            return
+        _image_task_recovery_started = True
+
+    from .image_generation import IMAGE_GENERATION_MODE, recover_tasks
+
+    if IMAGE_GENERATION_MODE == "thread":
+        threading.Thread(target=recover_tasks, name="image-task-recovery", daemon=True).start()
@@ -1,14 +1,31 @@
-from typing import Optional
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+import hashlib
 import os
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlparse
 import mimetypes
 
 
+def versioned_url(url: str, content: bytes) -> str:
+    """
+    Tag a public URL with `v=<content hash>`.
+
+    Objects re-uploaded to the same path keep the same public URL, so caches
+    keyed by URL (the image fetch cache, browsers, the CDN) would keep serving
+    the old bytes. The version changes whenever the content does.
+    """
+    parsed = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if key != "v"]
+    query.append(("v", hashlib.sha256(content).hexdigest()[:16]))
+    return parsed._replace(query=urlencode(query)).geturl()
+
+
 class SupabaseBucketManager:
     """
     Supabase Storage bucket manager.
     - Upload bytes
-    - Upload local files
+    - Upload local files (streamed)
+    - Upload many objects concurrently
     - Delete by path
     - Delete by URL
     - Get public URL
@@ -32,8 +49,7 @@ class SupabaseBucketManager:
         final_bucket = bucket_name or os.environ.get("SUPABASE_BUCKET", "generated-images")
         return cls(supabase_url=supabase_url, supabase_key=supabase_key, bucket_name=final_bucket)
 
-    def store_bytes(self, object_bytes: bytes, object_path: str, *, upsert: bool = True, content_type: Optional[str] = None) -> str:
-        """Upload raw bytes to the bucket. Upserts by default if the object exists."""
+    def _upload(self, payload: Union[bytes, BinaryIO], object_path: str, *, upsert: bool, content_type: Optional[str]) -> str:
         storage = self._client.storage.from_(self.bucket_name)
         # Normalize path to avoid leading slash issues
         normalized_path = object_path.lstrip("/")
@@ -45,15 +61,53 @@ class SupabaseBucketManager:
         # Convert upsert bool to "true"/"false" strings to be safe
         file_options["upsert"] = "true" if upsert else "false"
         if content_type:
-            file_options["contentType"] = content_type
-        storage.upload(normalized_path, object_bytes, file_options=file_options)
+            # storage3 reads the header name; "contentType" was sent as an unknown header.
+            file_options["content-type"] = content_type
+        storage.upload(normalized_path, payload, file_options=file_options)
         return storage.get_public_url(normalized_path)
 
-    def store_file(self, file_path: str, object_path: str) -> str:
-        """Upload a local file to the bucket."""
+    def store_bytes(self, object_bytes: bytes, object_path: str, *, upsert: bool = True, content_type: Optional[str] = None) -> str:
+        """Upload raw bytes to the bucket. Upserts by default if the object exists."""
+        return self._upload(object_bytes, object_path, upsert=upsert, content_type=content_type)
+
+    def store_file(self, file_path: Union[str, os.PathLike], object_path: str, *, upsert: bool = True, content_type: Optional[str] = None) -> str:
+        """Upload a local file to the bucket, streaming it from disk instead of reading it into memory."""
+        if content_type is None:
+            content_type, _ = mimetypes.guess_type(str(file_path))
         with open(file_path, "rb") as f:
-            data = f.read()
-        return self.store_bytes(data, object_path)
+            return self._upload(f, object_path, upsert=upsert, content_type=content_type)
+
+    def store_many(
+        self,
+        items: Iterable[Tuple[Union[bytes, str, os.PathLike], str]],
+        *,
+        upsert: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Upload several objects concurrently and return their public URLs in input order.
+
+        Each item is `(source, object_path)`; bytes are uploaded as-is and
+        paths are streamed from disk with `store_file`. Uploads run on a
+        bounded thread pool (`SUPABASE_UPLOAD_CONCURRENCY`, default 4), so at
+        most that many file handles or buffers are in flight. The first
+        failure is raised after the remaining uploads have finished.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if max_workers is None:
+            max_workers = int(os.environ.get("SUPABASE_UPLOAD_CONCURRENCY", "4"))
+
+        def store_one(item):
+            source, object_path = item
+            if isinstance(source, (bytes, bytearray)):
+                return self.store_bytes(bytes(source), object_path, upsert=upsert)
+            return self.store_file(source, object_path, upsert=upsert)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            futures = [executor.submit(store_one, item) for item in items]
+        return [future.result() for future in futures]
 
     def delete_path(self, object_path: str) -> bool:
         """Delete an object by its bucket-relative path."""
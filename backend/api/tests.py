@@ -0,0 +1,206 @@
+import threading
+import time
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from .catalog_cache import cached_catalog_response
+from .models import Category, Product
+from .pagination import ProductKeysetPagination
+from .storage import SupabaseBucketManager
+from .views import _products_search_response
+
+
+def _cursor_from(link):
+    return parse_qs(urlsplit(link).query)["cursor"][0] if link else None
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "search ranking needs PostgreSQL full-text and pg_trgm")
+class ProductSearchPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Jackets")
+        titles = (
+            # Identical titles tie exactly; the variants score a hair apart.
+            ["Blue Denim Jacket"] * 5
+            + ["Blue Denim Jackets", "Blue Denim Jacket Slim", "Blue Denim Jacket Slim Fit", "Denim Jacket Blue"]
+            + ["Light Blue Denim Jacket"] * 3
+        )
+        for index, title in enumerate(titles):
+            Product.objects.create(
+                title=title,
+                price=10 + index,
+                url=f"https://example.com/products/{index}",
+                image_url=f"https://example.com/images/{index}.jpg",
+                category=category,
+            )
+
+    def _search(self, **params):
+        request = Request(APIRequestFactory().get("/api/products/search/", {"q": "blue denim jacket", **params}))
+        return _products_search_response(request).data
+
+    def test_cursor_pages_match_single_page_order(self):
+        expected = [row["id"] for row in self._search(page_size=300)["results"]]
+        self.assertEqual(len(expected), Product.objects.count())
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = self._search(**params)
+            seen.extend(row["id"] for row in data["results"])
+            cursor = _cursor_from(data["next"])
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_the_preceding_page(self):
+        first = self._search(page_size=3)
+        second = self._search(page_size=3, cursor=_cursor_from(first["next"]))
+        back = self._search(page_size=3, cursor=_cursor_from(second["previous"]))
+
+        self.assertEqual(
+            [row["id"] for row in back["results"]],
+            [row["id"] for row in first["results"]],
+        )
+
+
+class KeysetCursorTests(SimpleTestCase):
+    def _request(self, **params):
+        return Request(APIRequestFactory().get("/api/products/", params))
+
+    def test_cursor_round_trip(self):
+        pagination = ProductKeysetPagination()
+        row = SimpleNamespace(price=1299.5, id=uuid.uuid4())
+
+        for reverse in (False, True):
+            cursor = pagination.encode_cursor(row, reverse=reverse)
+            self.assertEqual(
+                pagination.decode_cursor(self._request(cursor=cursor)),
+                (1299.5, str(row.id), reverse),
+            )
+
+    def test_missing_cursor_decodes_to_none(self):
+        self.assertIsNone(ProductKeysetPagination().decode_cursor(self._request()))
+
+    def test_malformed_cursor_is_not_found(self):
+        for cursor in ("not-base64!", "e30=", "eyJrIjoiYSIsImkiOiIxIn0="):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                ProductKeysetPagination().decode_cursor(self._request(cursor=cursor))
+
+
+@mock.patch("api.catalog_cache.get_catalog_version", return_value=7)
+class CachedCatalogResponseTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def _build(self):
+        self.builds += 1
+        return Response({"results": [{"id": "a"}]})
+
+    def _get(self, **extra):
+        request = Request(APIRequestFactory().get("/api/categories/", **extra))
+        return cached_catalog_response(request, "categories", self._build)
+
+    def test_matching_etag_returns_304_without_body(self, _version):
+        etag = self._get()["ETag"]
+
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(header=header):
+                response = self._get(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertIsNone(response.data)
+                self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.builds, 1)
+
+    def test_stale_etag_returns_full_response(self, _version):
+        response = self._get(HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"results": [{"id": "a"}]})
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_version_bump_rebuilds(self, version):
+        self._get()
+        version.return_value = 8
+        self._get()
+
+        self.assertEqual(self.builds, 2)
+
+    def test_error_responses_are_not_cached(self, _version):
+        def build():
+            self.builds += 1
+            return Response({"detail": "bad"}, status=status.HTTP_400_BAD_REQUEST)
+
+        request = Request(APIRequestFactory().get("/api/categories/"))
+        for _ in range(2):
+            response = cached_catalog_response(request, "categories", build)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.builds, 2)
+
+
+class FakeBucket:
+    def __init__(self, fail_path=None):
+        self.fail_path = fail_path
+        self.uploaded = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def upload(self, path, payload, file_options):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later items finish first, so input order is not completion order.
+        time.sleep(0.01 if path.endswith("0.jpg") else 0.001)
+        with self._lock:
+            self.in_flight -= 1
+            self.uploaded.append(path)
+        if path == self.fail_path:
+            raise RuntimeError("upload failed")
+
+    def get_public_url(self, path):
+        return f"https://storage.example.com/{path}"
+
+
+class StoreManyTests(SimpleTestCase):
+    def _manager(self, bucket):
+        manager = SupabaseBucketManager.__new__(SupabaseBucketManager)
+        manager.bucket_name = "image_assets"
+        manager._client = SimpleNamespace(storage=SimpleNamespace(from_=lambda name: bucket))
+        return manager
+
+    def test_returns_urls_in_input_order_with_bounded_concurrency(self):
+        bucket = FakeBucket()
+        items = [(b"image", f"/profile/{index}.jpg") for index in range(6)]
+
+        urls = self._manager(bucket).store_many(items, max_workers=2)
+
+        self.assertEqual(urls, [f"https://storage.example.com/profile/{index}.jpg" for index in range(6)])
+        self.assertLessEqual(bucket.max_in_flight, 2)
+
+    def test_raises_after_the_other_uploads_finish(self):
+        bucket = FakeBucket(fail_path="profile/0.jpg")
+        items = [(b"image", f"/profile/{index}.jpg") for index in range(4)]
+
+        with self.assertRaises(RuntimeError):
+            self._manager(bucket).store_many(items, max_workers=2)
+        self.assertEqual(len(bucket.uploaded), 4)
+
+    def test_empty_input_uploads_nothing(self):
+        self.assertEqual(self._manager(FakeBucket()).store_many([]), [])
@@ -3,13 +3,16 @@ from .views import (
 	create_user_view,
     validate_token_view,
     products_list_view,
+    products_search_view,
     product_detail_view,
     categories_list_view,
+    category_stats_view,
     catalog_metadata_view,
     me_view,
     update_user_view,
     update_user_base_image_view,
     image_generation_view,
+    image_generation_status_view,
     list_generations
 )
 
@@ -20,9 +23,12 @@ urlpatterns = [
     path('users/me/generations/', list_generations, name='list_generations'),
     path('users/<uuid:user_id>/', update_user_view, name='users_update'),
 	path('products/', products_list_view, name='list_products'),
+	path('products/search/', products_search_view, name='search_products'),
 	path('categories/', categories_list_view, name='list_categories'),
+	path('categories/stats/', category_stats_view, name='category_stats'),
 	path('catalog/metadata/', catalog_metadata_view, name='catalog_metadata'),
 	path('image_generations/', image_generation_view, name='image_generate'),
+	path('image_generations/<uuid:task_id>/', image_generation_status_view, name='image_generation_status'),
     path("products/<uuid:product_id>/", product_detail_view, name="product-detail"),
 	path('auth/validate/', validate_token_view, name='validate_token'),
 ]
@@ -0,0 +1,32 @@
+import os
+from typing import Optional
+
+from django.core.cache import cache
+
+from .models import AppUser
+
+APP_USER_CACHE_TTL = int(os.getenv("APP_USER_CACHE_TTL", "60"))
+
+
+def app_user_cache_key(supabase_uid: str) -> str:
+    return f"app_user:{supabase_uid}"
+
+
+def get_cached_app_user(supabase_uid: str) -> Optional[AppUser]:
+    """
+    Return the AppUser for a Supabase `sub`, cached for APP_USER_CACHE_TTL seconds.
+
+    Saves and deletes drop the entry (see api/signals.py); bulk `.update()`
+    calls bypass signals and must call `invalidate_app_user()` themselves.
+    """
+    key = app_user_cache_key(supabase_uid)
+    user = cache.get(key)
+    if user is None:
+        user = AppUser.objects.filter(supabase_uid=supabase_uid).first()
+        if user is not None and APP_USER_CACHE_TTL > 0:
+            cache.set(key, user, APP_USER_CACHE_TTL)
+    return user
+
+
+def invalidate_app_user(supabase_uid: str) -> None:
+    cache.delete(app_user_cache_key(supabase_uid))
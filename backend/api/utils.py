@@ -1,57 +1,208 @@
 import os
+import bisect
+import logging
+import threading
+import time
 import dotenv
 dotenv.load_dotenv()
-from typing import List
+from typing import List, Optional
 from google import genai
 from google.genai import types
 
+from .image_cache import image_fetch_cache
 
-def generate_ai_product_image(prompt: str,base_image: bytes,input_images: List[bytes],) -> bytes:
+logger = logging.getLogger(__name__)
 
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+GEMINI_IMAGE_MODEL = os.environ.get("GEMINI_IMAGE_MODEL", "gemini-2.5-flash-image")
+# Calls allowed in flight per process, and how many more may wait for a slot.
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_MAX_QUEUE = int(os.environ.get("GEMINI_MAX_QUEUE", "16"))
+GEMINI_QUEUE_TIMEOUT = float(os.environ.get("GEMINI_QUEUE_TIMEOUT", "120"))
 
-    parts = [
-        types.Part(text=prompt),
 
-        types.Part(
-            inline_data=types.Blob(
-                mime_type="image/jpeg",
-                data=base_image
-            )
-        ),
-    ]
+class ImageGenerationBusy(RuntimeError):
+    """Raised instead of queueing when the generation backend is saturated."""
+
+
+class GeminiImageBackend:
+    """Gemini image generation with one client shared by every thread in the process."""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = GEMINI_IMAGE_MODEL):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = genai.Client(api_key=self.api_key or os.environ.get("GEMINI_API_KEY"))
+        return self._client
+
+    def generate(self, prompt: str, base_image: bytes, input_images: List[bytes]) -> bytes:
+        parts = [
+            types.Part(text=prompt),
 
-    for img in input_images:
-        parts.append(
             types.Part(
                 inline_data=types.Blob(
                     mime_type="image/jpeg",
-                    data=img
+                    data=base_image
+                )
+            ),
+        ]
+
+        for img in input_images:
+            parts.append(
+                types.Part(
+                    inline_data=types.Blob(
+                        mime_type="image/jpeg",
+                        data=img
+                    )
                 )
             )
-        )
 
-    contents = [
-        types.Content(
-            role="user",
-            parts=parts
+        contents = [
+            types.Content(
+                role="user",
+                parts=parts
+            )
+        ]
+
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                response_modalities=["IMAGE"]
+            ),
         )
-    ]
-
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-image",
-        contents=contents,
-        config=types.GenerateContentConfig(
-            response_modalities=["IMAGE"]
-        ),
-    )
-
-    for candidate in response.candidates or []:
-        content = candidate.content
-        if not content:
-            continue
-        for part in content.parts or []:
-            if part.inline_data and part.inline_data.data:
-                return part.inline_data.data
-
-    raise RuntimeError("No image returned by Gemini.")
\ No newline at end of file
+
+        for candidate in response.candidates or []:
+            content = candidate.content
+            if not content:
+                continue
+            for part in content.parts or []:
+                if part.inline_data and part.inline_data.data:
+                    return part.inline_data.data
+
+        raise RuntimeError("No image returned by Gemini.")
+
+
+class FakeImageBackend:
+    """Offline stand-in for tests and benchmarks: waits `latency` seconds and echoes the base image."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate(self, prompt: str, base_image: bytes, input_images: List[bytes]) -> bytes:
+        if self.latency:
+            time.sleep(self.latency)
+        return base_image
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram; each count is for (previous bound, bound] in seconds."""
+
+    BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BUCKETS) + 1)
+        self._sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self._sum += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        labels = [f"le_{bound}" for bound in self.BUCKETS] + ["le_inf"]
+        return {"buckets": dict(zip(labels, counts)), "count": sum(counts), "sum": round(total, 3)}
+
+
+def _backend_from_env():
+    if os.environ.get("IMAGE_GENERATION_BACKEND", "gemini") == "fake":
+        return FakeImageBackend(latency=float(os.environ.get("FAKE_GENERATION_LATENCY", "0")))
+    return GeminiImageBackend()
+
+
+_backend = _backend_from_env()
+_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+_waiting = 0
+_waiting_lock = threading.Lock()
+_queue_wait_histogram = LatencyHistogram()
+_call_latency_histogram = LatencyHistogram()
+_outcomes = {"succeeded": 0, "failed": 0, "rejected": 0}
+
+
+def set_image_generation_backend(backend) -> None:
+    """Swap the backend (anything with `generate(prompt, base_image, input_images) -> bytes`)."""
+    global _backend
+    _backend = backend
+
+
+def get_image_generation_metrics() -> dict:
+    with _waiting_lock:
+        waiting = _waiting
+        outcomes = dict(_outcomes)
+    return {
+        "backend": type(_backend).__name__,
+        "max_concurrency": GEMINI_MAX_CONCURRENCY,
+        "waiting": waiting,
+        "outcomes": outcomes,
+        "queue_wait_seconds": _queue_wait_histogram.snapshot(),
+        "call_seconds": _call_latency_histogram.snapshot(),
+    }
+
+
+def _record_outcome(outcome: str) -> None:
+    with _waiting_lock:
+        _outcomes[outcome] += 1
+
+
+def generate_ai_product_image(prompt: str,base_image: bytes,input_images: List[bytes],) -> bytes:
+    """
+    Generate a try-on image through the configured backend.
+
+    Inputs are downscaled/re-encoded to JPEG first. At most GEMINI_MAX_CONCURRENCY
+    calls run at once per process; up to GEMINI_MAX_QUEUE more wait (for at most
+    GEMINI_QUEUE_TIMEOUT seconds) and anything beyond that fails fast with
+    ImageGenerationBusy.
+    """
+    global _waiting
+    base_image = image_fetch_cache.prepare(base_image)
+    input_images = [image_fetch_cache.prepare(img) for img in input_images]
+
+    with _waiting_lock:
+        if _waiting >= GEMINI_MAX_QUEUE:
+            _outcomes["rejected"] += 1
+            raise ImageGenerationBusy("Image generation queue is full")
+        _waiting += 1
+    queued_at = time.monotonic()
+    try:
+        acquired = _slots.acquire(timeout=GEMINI_QUEUE_TIMEOUT)
+    finally:
+        with _waiting_lock:
+            _waiting -= 1
+    _queue_wait_histogram.observe(time.monotonic() - queued_at)
+    if not acquired:
+        _record_outcome("rejected")
+        raise ImageGenerationBusy("Timed out waiting for an image generation slot")
+
+    started = time.monotonic()
+    try:
+        image = _backend.generate(prompt, base_image, input_images)
+    except Exception:
+        _record_outcome("failed")
+        raise
+    finally:
+        _slots.release()
+        elapsed = time.monotonic() - started
+        _call_latency_histogram.observe(elapsed)
+        logger.info("Image generation call took %.2fs (queued %.2fs)", elapsed, started - queued_at)
+    _record_outcome("succeeded")
+    return image
@@ -2,6 +2,7 @@ import os
 import datetime
 import json
 import logging
+import uuid
 import dotenv
 dotenv.load_dotenv()
 
@@ -12,10 +13,16 @@ from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser, BaseParser
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-from .utils import generate_ai_product_image
+from .provisioning import DEFAULT_INFO_PROMPT, DEFAULT_PROFILE_IMAGE_URL, schedule_profile_image_copy
+from .image_generation import dispatch_task, generation_fingerprint
 
 
 class RawImageParser(BaseParser):
@@ -24,12 +31,13 @@ class RawImageParser(BaseParser):
     def parse(self, stream, media_type=None, parser_context=None):
         return stream.read()
 from supabase import create_client
-from .models import AppUser, Product, Category, CatalogMetadata, ImageGenerationTask,ImageGeneration
+from .models import AppUser, Product, Category, CategoryStats, CatalogMetadata, ImageGenerationTask,ImageGeneration
 from .serializers import (
 	CreateUserSerializer,
 	AppUserSerializer,
 	ProductSerializer,
 	CategorySerializer,
+	CategoryStatsSerializer,
 	CatalogMetadataSerializer,
 	UpdateAppUserSerializer,
 	ImageGenerationTaskSerializer,
@@ -38,10 +46,16 @@ from .serializers import (
 
 import requests
 
-from .storage import SupabaseBucketManager
+from .storage import SupabaseBucketManager, versioned_url
+from .pagination import ProductKeysetPagination, ProductSearchPagination
+from .catalog_cache import CATALOG_VERSION_TTL, cached_catalog_response
 
 logger = logging.getLogger(__name__)
 
+# Must match the expression indexed by migration 0008 for the GIN index to be used.
+PRODUCT_SEARCH_CONFIG = "english"
+PRODUCT_SEARCH_VECTOR = SearchVector("title", config=PRODUCT_SEARCH_CONFIG)
+
 supabase_bucket_manager = SupabaseBucketManager.from_env("image_assets")
 
 supabase_url = os.getenv("SUPABASE_URL")
@@ -63,33 +77,23 @@ def create_user_view(request):
 	app_user_id = validated["supabase_uid"]
 	role = "user"
 	tokens = 100
-	default_image_url = "https://images.pexels.com/photos/1043471/pexels-photo-1043471.jpeg"
-	uploaded_image_url = ""
-	try:
-		image_bytes = requests.get(default_image_url).content
-		uploaded_image_url = supabase_bucket_manager.store_bytes(image_bytes,f"/profile/{app_user_id}.jpg")
-	except Exception:
-		return Response({
-			"created":False,
-			"response":"Failed to create user."
-		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-	info_prompt = "A man standing with jacket on his hand and his handsome."
 
 	app_user_defaults = {
         "supabase_uid": validated["supabase_uid"],
         "name": validated.get("name", ""),
         "tokens": tokens,
-        "info_prompt": validated.get("info_prompt",info_prompt),
-        "base_image_path": uploaded_image_url,
+        "info_prompt": validated.get("info_prompt", DEFAULT_INFO_PROMPT),
         "email": validated["email"],
         "role": role,
     }
 	
+	# The profile image starts as the shared default and is copied in the background.
 	app_user, created = AppUser.objects.update_or_create(
         id=app_user_id,
         defaults=app_user_defaults,
+        create_defaults={**app_user_defaults, "base_image_path": DEFAULT_PROFILE_IMAGE_URL},
     )
+	schedule_profile_image_copy(app_user)
 
 	return Response(
         {
@@ -109,29 +113,26 @@ def me_view(request):
 @permission_classes([IsAuthenticated])
 @parser_classes([FormParser, JSONParser])
 def update_user_view(request, user_id):
-	try:
-		user = AppUser.objects.get(id=user_id)
-	except AppUser.DoesNotExist:
-		raise NotFound("User not found")
-
 	if str(request.user.id) != str(user_id):
 		raise PermissionDenied("You are not allowed to update this user")
+	user = request.user
 
 	serializer = UpdateAppUserSerializer(data=request.data)
 	serializer.is_valid(raise_exception=True)
 	validated = serializer.validated_data
 
-	updated = False
+	updated_fields = []
 
 	if "name" in validated:
 		user.name = validated["name"]
-		updated = True
+		updated_fields.append("name")
 	if "info_prompt" in validated:
 		user.info_prompt = validated["info_prompt"]
-		updated = True
+		updated_fields.append("info_prompt")
 
-	if updated:
-		user.save()
+	if updated_fields:
+		# request.user may be a cached copy; only write what changed.
+		user.save(update_fields=updated_fields)
 
 	return Response(AppUserSerializer(user).data)
 
@@ -140,13 +141,9 @@ def update_user_view(request, user_id):
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser, RawImageParser, JSONParser])
 def update_user_base_image_view(request, user_id):
-	try:
-		user = AppUser.objects.get(id=user_id)
-	except AppUser.DoesNotExist:
-		raise NotFound("User not found")
-
 	if str(request.user.id) != str(user_id):
 		raise PermissionDenied("You are not allowed to update this user")
+	user = request.user
 
 	image_bytes = None
 	uploaded_file = request.FILES.get("image") or request.FILES.get("file")
@@ -189,8 +186,9 @@ def update_user_base_image_view(request, user_id):
 					ext = "jpg"
 		object_path = f"profile/{user.supabase_uid}.{ext}"
 		new_url = supabase_bucket_manager.store_bytes(image_bytes, object_path)
-		user.base_image_path = new_url
-		user.save()
+		# Same object path on every upload: the version keeps URL-keyed caches from serving the old image.
+		user.base_image_path = versioned_url(new_url, image_bytes)
+		user.save(update_fields=["base_image_path"])
 	except Exception as e:
 		return Response({"detail": f"Failed to upload image: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -204,25 +202,40 @@ def validate_token_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def categories_list_view(request):
+	return cached_catalog_response(request, "categories", _categories_list_response)
+
+
+def _categories_list_response():
 	queryset = Category.objects.all()
 	serializer = CategorySerializer(queryset, many=True)
 
 	return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def category_stats_view(request):
+	return cached_catalog_response(request, "category_stats", _category_stats_response)
+
+
+def _category_stats_response():
+	# Rows are precomputed by the data-ingestor; categories without products have none.
+	queryset = CategoryStats.objects.select_related("category").order_by("category__name")
+	serializer = CategoryStatsSerializer(queryset, many=True)
+
+	return Response(serializer.data)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def products_list_view(request):
-	queryset = Product.objects.select_related("category").all()
-	params = request.query_params
+	return cached_catalog_response(request, "products", lambda: _products_list_response(request))
 
+
+def _filter_products(queryset, params):
 	category_ids = params.get("category_ids")
 	min_price = params.get("min_price")
 	max_price = params.get("max_price")
-	page_size = params.get("page_size")
-    
-	if page_size is None:
-		page_size = 100
 
 	if category_ids is not None:
 		try:
@@ -247,13 +260,93 @@ def products_list_view(request):
 			raise ValidationError({"max_price": "Must be a valid number."})
 		queryset = queryset.filter(price__lte=max_price_val)
 
+	return queryset
+
+
+def _product_list_serializer_kwargs(params):
+	kwargs = {"flat_category": params.get("flat_category", "").lower() in ("1", "true", "yes")}
+	fields = params.get("fields")
+	if fields:
+		kwargs["fields"] = [name.strip() for name in fields.split(",") if name.strip()]
+	return kwargs
+
+
+def _product_list_queryset(serializer_kwargs):
+	queryset = Product.objects.all()
+	fields = serializer_kwargs.get("fields")
+	if not serializer_kwargs["flat_category"] and (fields is None or "category" in fields):
+		queryset = queryset.select_related("category")
+	return queryset
+
+
+def _products_list_response(request):
+	params = request.query_params
+	serializer_kwargs = _product_list_serializer_kwargs(params)
+	queryset = _product_list_queryset(serializer_kwargs)
+	page_size = params.get("page_size")
+    
+	if page_size is None:
+		page_size = 100
+
+	queryset = _filter_products(queryset, params)
+
+	if params.get("pagination") == "cursor" or params.get("cursor"):
+		# Keyset mode: no OFFSET scan and no COUNT(*). The total is the
+		# approximate catalog size and is only meaningful without filters.
+		count = None
+		if all(params.get(name) is None for name in ("category_ids", "min_price", "max_price")):
+			count = _normalize_product_count(_catalog_metadata_value("total_products"))
+		paginator = ProductKeysetPagination(count=count)
+		page = paginator.paginate_queryset(queryset, request)
+		serializer = ProductSerializer(page, many=True, **serializer_kwargs)
+		return paginator.get_paginated_response(serializer.data)
+
 	paginator = PageNumberPagination()
 	paginator.page_size = page_size
 	paginator.page_size_query_param = "page_size"
 	paginator.max_page_size = 300
 
 	page = paginator.paginate_queryset(queryset, request)
-	serializer = ProductSerializer(page, many=True)
+	serializer = ProductSerializer(page, many=True, **serializer_kwargs)
+	return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def products_search_view(request):
+	return cached_catalog_response(request, "search", lambda: _products_search_response(request))
+
+
+def _products_search_response(request):
+	params = request.query_params
+	search_text = (params.get("q") or "").strip()
+	if not search_text:
+		raise ValidationError({"q": "This query parameter is required."})
+
+	serializer_kwargs = _product_list_serializer_kwargs(params)
+	queryset = _filter_products(_product_list_queryset(serializer_kwargs), params)
+
+	if connection.vendor == "postgresql":
+		# Full-text hits and trigram (typo-tolerant) hits are each served by a
+		# GIN index from migration 0008; the planner ORs the two bitmaps.
+		search_query = SearchQuery(search_text, config=PRODUCT_SEARCH_CONFIG, search_type="websearch")
+		# Both terms are real (float4); cast to double precision so the cursor's
+		# Python float compares exactly against the stored score at page boundaries.
+		queryset = queryset.annotate(
+			search=PRODUCT_SEARCH_VECTOR,
+			score=Cast(
+				SearchRank(PRODUCT_SEARCH_VECTOR, search_query) + TrigramSimilarity("title", search_text),
+				FloatField(),
+			),
+		).filter(Q(search=search_query) | Q(title__trigram_similar=search_text))
+	else:
+		queryset = queryset.annotate(score=Value(0.0, output_field=FloatField())).filter(
+			title__icontains=search_text
+		)
+
+	paginator = ProductSearchPagination()
+	page = paginator.paginate_queryset(queryset, request)
+	serializer = ProductSerializer(page, many=True, **serializer_kwargs)
 	return paginator.get_paginated_response(serializer.data)
 
 
@@ -264,28 +357,6 @@ def _catalog_metadata_value(key):
 		return None
 
 
-def _sync_catalog_metadata():
-	product_count = Product.objects.count()
-	total_products, _created = CatalogMetadata.objects.get_or_create(
-		key="total_products",
-		defaults={"value": product_count},
-	)
-	product_count_changed = total_products.value != product_count
-	if product_count_changed:
-		total_products.value = product_count
-		total_products.save(update_fields=["value", "updated_at"])
-
-	last_fetched, _created = CatalogMetadata.objects.get_or_create(
-		key="last_fetched",
-		defaults={"value": timezone.now().isoformat()},
-	)
-	if product_count_changed or not last_fetched.value:
-		last_fetched.value = timezone.now().isoformat()
-		last_fetched.save(update_fields=["value", "updated_at"])
-
-	return product_count, last_fetched.value
-
-
 def _normalize_product_count(value):
 	if isinstance(value, bool):
 		return None
@@ -314,14 +385,24 @@ def _normalize_last_fetched(value):
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def catalog_metadata_view(request):
-	synced_product_count, synced_last_fetched = _sync_catalog_metadata()
-	product_count = _normalize_product_count(_catalog_metadata_value("total_products"))
+	# last_fetched is stamped without a version bump, so this entry expires on its own.
+	return cached_catalog_response(request, "metadata", _catalog_metadata_response, timeout=CATALOG_VERSION_TTL)
+
+
+def _catalog_metadata_response():
+	# Rows are maintained by the data-ingestor on write; this view only reads them.
+	values = dict(
+		CatalogMetadata.objects.filter(key__in=("total_products", "last_fetched"))
+		.values_list("key", "value")
+	)
+	product_count = _normalize_product_count(values.get("total_products"))
 	if product_count is None:
-		product_count = synced_product_count
+		# Only before migration 0007 seeds the row.
+		product_count = Product.objects.count()
 
 	serializer = CatalogMetadataSerializer({
 		"product_count": product_count,
-		"last_data_fetched": _normalize_last_fetched(synced_last_fetched),
+		"last_data_fetched": _normalize_last_fetched(values.get("last_fetched")),
 	})
 	return Response(serializer.data)
 
@@ -329,6 +410,10 @@ def catalog_metadata_view(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def product_detail_view(request, product_id):
+    return cached_catalog_response(request, "product", lambda: _product_detail_response(product_id))
+
+
+def _product_detail_response(product_id):
     try:
         product = Product.objects.select_related("category").get(id=product_id)
     except Product.DoesNotExist:
@@ -344,117 +429,124 @@ def image_generation_view(request):
 	body_data = request.data
 	input_products = body_data.get("input_products", [])
 	try:
-		product_ids = [product["id"] for product in input_products]
-	except (KeyError, TypeError):
+		product_ids = [uuid.UUID(str(product["id"])) for product in input_products]
+	except (KeyError, TypeError, ValueError):
 		raise ValidationError("Each input product must include an id")
 	custom_prompt = body_data.get("custom_prompt", "") or ""
-	user_id = str(request.user.id)
+	user = request.user
+	user_id = str(user.id)
 
 	if not input_products:
 		raise ValidationError("input_products is required")
 
-	try:
-		user = AppUser.objects.get(id=user_id)
-		if user.role != "super_user":
-			return Response(
-				{
-					"code": "image_generation_super_user_required",
-					"detail": "Image generation is limited to Super Users. Your credits were not charged.",
-					"required_role": "super_user",
-					"current_role": user.role,
-					"required_credits": 0,
-					"available_credits": user.tokens or 0,
-					"credits_charged": 0,
-				},
-				status=status.HTTP_403_FORBIDDEN,
-			)
-		info_prompt = user.info_prompt
-		response = requests.get(user.base_image_path, timeout=10)
-		response.raise_for_status()
-		base_image = response.content
-	except AppUser.DoesNotExist:
-		raise NotFound("User not found")
-	except requests.exceptions.RequestException:
-		logger.exception(
-			"Failed to fetch base image for image generation",
-			extra={
-				"user_id": user_id,
-				"base_image_path": getattr(user, "base_image_path", ""),
+	if user.role != "super_user":
+		return Response(
+			{
+				"code": "image_generation_super_user_required",
+				"detail": "Image generation is limited to Super Users. Your credits were not charged.",
+				"required_role": "super_user",
+				"current_role": user.role,
+				"required_credits": 0,
+				"available_credits": user.tokens or 0,
+				"credits_charged": 0,
 			},
+			status=status.HTTP_403_FORBIDDEN,
 		)
-		raise ValidationError("Failed to fetch base image")
-	
-	input_images = []
 
-	for product in input_products:
-		try:
-			image_url = product["image_url"]
-			response = requests.get(image_url, timeout=10)
-			response.raise_for_status()
-			input_images.append(response.content)
-		except (KeyError, requests.exceptions.RequestException):
-			logger.exception(
-				"Failed to fetch product image for image generation",
-				extra={
-					"user_id": user_id,
-					"product_id": product.get("id") if isinstance(product, dict) else None,
-					"image_url": product.get("image_url") if isinstance(product, dict) else None,
-				},
-			)
-			raise ValidationError("Invalid or unreachable product image")
-	
-	image_generation_task = ImageGenerationTask.objects.create(
-		creator=user,
-		product_ids=product_ids,
-		custom_prompt=custom_prompt,
-		created_at=str(datetime.datetime.now()),
-		updated_at=str(datetime.datetime.now()),
-		status="pending"
-	)
-	try:
-		image_generation_task.status = "processing"
-		image_generation_task.save()
-		image_generated_bytes = generate_ai_product_image(info_prompt+custom_prompt,base_image,input_images)
-		image_generated = supabase_bucket_manager.store_bytes(image_generated_bytes,f'/generations/{image_generation_task.id}.jpg')
-		image_generation = ImageGeneration.objects.create(
-			task=image_generation_task,
-			creator=user,
-			image=image_generated,
-			created_at = str(datetime.datetime.now())
+	if not user.base_image_path:
+		raise ValidationError("Upload a base image before generating")
+
+	existing_ids = set(Product.objects.filter(id__in=product_ids).values_list("id", flat=True))
+	if len(existing_ids) != len(set(product_ids)):
+		raise ValidationError("Invalid or unknown input product")
+
+	# The base image itself is only downloaded by the worker.
+	prompt = f"{user.info_prompt or ''} {custom_prompt}".strip()
+	fingerprint = generation_fingerprint(user.base_image_path, product_ids, prompt)
+
+	# Identical request already answered: return it instead of paying for Gemini again.
+	if not _is_truthy(body_data.get("force")):
+		previous_task = (
+			ImageGenerationTask.objects.select_related("creator")
+			.filter(creator=user, fingerprint=fingerprint, status="completed", generated_images__isnull=False)
+			.order_by("-created_at")
+			.first()
 		)
-		image_generation_task.status = "completed"
-		image_generation_task.save()
-		serializer = ImageGenerationSerializer(image_generation)
-		return Response(serializer.data)
-	except Exception:
-		logger.exception(
-			"Image generation processing failed",
-			extra={
-				"task_id": str(image_generation_task.id),
-				"user_id": str(user.id),
-				"product_count": len(input_products),
-			},
+		if previous_task is not None:
+			data = _image_generation_task_payload(request, previous_task)
+			data["deduplicated"] = True
+			return Response(data, status=status.HTTP_200_OK)
+
+	# Image downloads, Gemini and the upload run off the request thread; see api/image_generation.py.
+	try:
+		with transaction.atomic():
+			image_generation_task = ImageGenerationTask.objects.create(
+				creator=user,
+				product_ids=product_ids,
+				custom_prompt=custom_prompt,
+				fingerprint=fingerprint,
+				status="pending"
+			)
+			transaction.on_commit(lambda: dispatch_task(image_generation_task))
+		deduplicated = False
+	except IntegrityError:
+		# Single-flight: an identical request is already pending or processing; join it.
+		image_generation_task = (
+			ImageGenerationTask.objects.select_related("creator")
+			.filter(creator=user, fingerprint=fingerprint, status__in=["pending", "processing"])
+			.first()
 		)
-		image_generation_task.status = "failed"
-		image_generation_task.save()
-	
-	serializer = ImageGenerationTaskSerializer(image_generation_task)
-	return Response(serializer.data,status=status.HTTP_417_EXPECTATION_FAILED)
+		if image_generation_task is None:
+			raise ValidationError("An identical generation just finished; retry to fetch it")
+		deduplicated = True
+
+	data = _image_generation_task_payload(request, image_generation_task)
+	data["deduplicated"] = deduplicated
+	return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+def _is_truthy(value):
+	if isinstance(value, bool):
+		return value
+	return str(value or "").lower() in ("1", "true", "yes")
+
+
+def _image_generation_task_payload(request, task):
+	data = dict(ImageGenerationTaskSerializer(task).data)
+	data["status_url"] = request.build_absolute_uri(reverse("image_generation_status", args=[task.id]))
+	generation = None
+	if task.status == "completed":
+		generation = task.generated_images.select_related("creator", "task__creator").first()
+	data["generation"] = ImageGenerationSerializer(generation).data if generation else None
+	return data
+
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-def list_generations(request):
+def image_generation_status_view(request, task_id):
 	try:
-		serializer = AppUserSerializer(request.user)
-		user_id = serializer.data['id']
-		user = AppUser.objects.get(id=user_id)
-	except AppUser.DoesNotExist:
-		raise NotFound("User not found")
-	
-	if str(user_id) != str(user.id):
-		return Response(status=status.HTTP_401_UNAUTHORIZED)
-	
-	generations = ImageGeneration.objects.filter(creator=user)
-	serializer = ImageGenerationSerializer(generations,many=True)
+		task = ImageGenerationTask.objects.select_related("creator").get(id=task_id, creator_id=request.user.id)
+	except ImageGenerationTask.DoesNotExist:
+		raise NotFound("Image generation task not found")
+
+	response = Response(_image_generation_task_payload(request, task))
+	if task.status in ("pending", "processing"):
+		response["Retry-After"] = "2"
+	return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def list_generations(request):
+	user = request.user
+
+	generations = list(
+		ImageGeneration.objects.filter(creator=user).select_related("creator", "task__creator")
+	)
+	# One query for every product referenced by any task, each serialized once.
+	product_ids = {product_id for generation in generations for product_id in generation.task.product_ids}
+	products = Product.objects.select_related("category").filter(id__in=product_ids)
+	products_by_id = {product.id: ProductSerializer(product).data for product in products}
+	serializer = ImageGenerationSerializer(generations, many=True, context={"products_by_id": products_by_id})
 
 	return Response(serializer.data,status=status.HTTP_200_OK)
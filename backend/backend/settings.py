@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'api',
@@ -90,6 +91,31 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 # Prefer Postgres via env (Supabase), fallback to SQLite for local dev.
+# Connections are kept open for DB_CONN_MAX_AGE seconds (0 closes them after
+# every request) and health-checked before reuse. DB_PGBOUNCER disables
+# server-side cursors for transaction-mode poolers; it defaults on for
+# Supabase's pooler port 6543.
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _postgres_database(name, user, password, host, port, sslmode):
+    port = str(port)
+    pgbouncer = _env_flag('DB_PGBOUNCER', 'true' if port == '6543' else 'false')
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'USER': user,
+        'PASSWORD': password,
+        'HOST': host,
+        'PORT': port,
+        'OPTIONS': {'sslmode': sslmode},
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': _env_flag('DB_CONN_HEALTH_CHECKS', 'true'),
+        'DISABLE_SERVER_SIDE_CURSORS': pgbouncer,
+    }
+
 
 database_url = os.getenv('DATABASE_URL')
 if database_url:
@@ -97,29 +123,25 @@ if database_url:
     query = parse_qs(parsed.query)
     sslmode = (query.get('sslmode', ['require'])[0])
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': parsed.path.lstrip('/'),
-            'USER': parsed.username,
-            'PASSWORD': parsed.password,
-            'HOST': parsed.hostname,
-            'PORT': parsed.port or '5432',
-            'OPTIONS': {'sslmode': sslmode},
-        }
+        'default': _postgres_database(
+            parsed.path.lstrip('/'),
+            parsed.username,
+            parsed.password,
+            parsed.hostname,
+            parsed.port or '5432',
+            sslmode,
+        )
     }
 elif os.getenv('SUPABASE_DB_HOST'):
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.getenv('SUPABASE_DB_NAME', 'postgres'),
-            'USER': os.getenv('SUPABASE_DB_USER', 'postgres'),
-            'PASSWORD': os.getenv('SUPABASE_DB_PASSWORD', ''),
-            'HOST': os.getenv('SUPABASE_DB_HOST'),
-            'PORT': os.getenv('SUPABASE_DB_PORT', '5432'),
-            'OPTIONS': {
-                'sslmode': os.getenv('SUPABASE_DB_SSLMODE', 'require'),
-            },
-        }
+        'default': _postgres_database(
+            os.getenv('SUPABASE_DB_NAME', 'postgres'),
+            os.getenv('SUPABASE_DB_USER', 'postgres'),
+            os.getenv('SUPABASE_DB_PASSWORD', ''),
+            os.getenv('SUPABASE_DB_HOST'),
+            os.getenv('SUPABASE_DB_PORT', '5432'),
+            os.getenv('SUPABASE_DB_SSLMODE', 'require'),
+        )
     }
 else:
     DATABASES = {
@@ -130,6 +152,28 @@ else:
     }
 
 
+# Cache
+# Catalog responses are cached here (api/catalog_cache.py). Use Redis when
+# REDIS_URL is set so every worker shares entries, else per-process memory.
+
+redis_url = os.getenv('REDIS_URL')
+if redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': redis_url,
+            'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'wearlytic'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'wearlytic-backend',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
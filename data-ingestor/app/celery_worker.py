@@ -4,12 +4,19 @@ Importing Modules for Celery Workers.
 from celery import Celery
 from celery.schedules import crontab
 from celery.exceptions import Ignore
+from celery.signals import worker_process_init, worker_ready
 from celery.utils.log import get_task_logger
-from app.db import ListingsManager, StatusManager, SourceManager, ProductUrlManager, BatchManager, ProductManager
+from app.db import ListingsManager, StatusManager, SourceManager, ProductUrlManager, BatchManager, ProductManager, StatsManager
+from app.db.product_url import RESCRAPE_IN_FLIGHT_HOURS
+from app.db.stats import STATUS_STATS_ID
 from app.models import Status, ProductUrl, Batch
+from app.utils import get_http_session
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import redis
 import requests
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 import uuid
 import time
 import os
@@ -27,6 +34,7 @@ source_manager = SourceManager()
 product_url_manager = ProductUrlManager()
 batch_manager = BatchManager()
 product_manager = ProductManager()
+stats_manager = StatsManager()
 """
 Celery Queue Configuration.
 """
@@ -44,6 +52,12 @@ headers = {
     "Authorization": f"Bearer {SCRAPING_AGENT_TOKEN}",
     "Content-Type": "application/json"
 }
+SCRAPING_AGENT_TIMEOUT = (
+    float(os.getenv("SCRAPING_AGENT_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("SCRAPING_AGENT_READ_TIMEOUT", "20")),
+)
+SCRAPING_AGENT_CONCURRENCY = int(os.getenv("SCRAPING_AGENT_CONCURRENCY", "8"))
+agent_session = get_http_session()
 
 def build_scraping_agent_url(path: str) -> str:
     base = (SCRAPING_AGENT_ENDPOINT or "").rstrip("/")
@@ -51,6 +65,10 @@ def build_scraping_agent_url(path: str) -> str:
 
 MAXIMUM_BATCH_SIZE = int(os.getenv('MAXIMUM_BATCH_SIZE'))
 MAXIMUM_BATCHES_TO_PROCESS = int(os.getenv('MAXIMUM_BATCHES_TO_PROCESS'))
+# Product scrapes dispatched per scrape_batch run; defaults to the old batch-based volume.
+RESCRAPE_BUDGET_PER_CYCLE = int(
+    os.getenv('RESCRAPE_BUDGET_PER_CYCLE', str(MAXIMUM_BATCHES_TO_PROCESS * MAXIMUM_BATCH_SIZE))
+)
 
 """
 Creating or Configuring Queue for DataIngestor
@@ -64,7 +82,7 @@ def is_scraping_agent_active():
     Does not raise exceptions.
     """
     try:
-        response = requests.get(url=SCRAPING_AGENT_ENDPOINT, timeout=5)
+        response = agent_session.get(url=SCRAPING_AGENT_ENDPOINT, timeout=5)
         if response.status_code == 200:
             logger.info("Scraping agent is active.")
             return True
@@ -75,6 +93,43 @@ def is_scraping_agent_active():
         logger.warning(f"Scraping agent not reachable: {e}. Skipping task.")
         return False
 
+def _warm_category_cache():
+    """
+    Preload the category name -> id cache so the first product writes skip the lookup.
+    Failures are logged and the cache is loaded lazily on the first write instead.
+    """
+    try:
+        product_manager.warm_category_cache()
+    except Exception as e:
+        logger.warning(f"Category cache warm-up failed, loading lazily: {e}")
+
+@worker_process_init.connect
+def warm_product_caches(**kwargs):
+    """Prefork pool: warm each child, the processes that actually run tasks."""
+    _warm_category_cache()
+
+@worker_ready.connect
+def warm_product_caches_in_process(sender=None, **kwargs):
+    """
+    Solo/thread pools (the deployed worker runs -P solo) run tasks in the main
+    process, where worker_process_init never fires. Under prefork this is the
+    parent, which runs no tasks, so it is skipped.
+    """
+    pool_cls = getattr(getattr(sender, "controller", None), "pool_cls", None)
+    if getattr(pool_cls, "__module__", "") != "celery.concurrency.prefork":
+        _warm_category_cache()
+
+@worker_ready.connect
+def reconcile_stats_on_startup(**kwargs):
+    """
+    Queue a stats reconcile when a worker starts, so the counters are exact
+    right after a deploy instead of holding only deltas until the hourly run.
+    """
+    try:
+        reconcile_stats.delay()
+    except Exception as e:
+        logger.warning(f"Could not queue startup stats reconcile: {e}")
+
 """
 Celery tasks to automate.
 """
@@ -108,33 +163,47 @@ def start_scraping_listing():
         logger.info("No listings found to scrape.")
         return
     for listing in listings:
-        try:
-            payload = {
-                "webpage_url": listing['url'],
-                "priority": "low",
-                "type_page": "listing"
-            }
-            logger.info(f"Calling Scraping Agent for URL: {listing['url']}")
-            response = requests.post(build_scraping_agent_url("scrape/"), json=payload, headers=headers)
-            if response.status_code == 200:
-                job_id = response.json().get('job_id')
-                logger.info(f"Scraping job created for {listing['url']}, job_id: {job_id}")
-
-                status = Status(
-                    id=str(uuid.uuid4()),
-                    ingestion_type="listing",
-                    job_id=job_id,
-                    status="processing",
-                    entity_id=listing['id']
-                )
-                status_manager.create_status(status)
-            else:
-                logger.error(
-                    f"Failed to call Scraping Agent for {listing['url']}. "
-                    f"Status code: {response.status_code}, Response: {response.text}"
-                )
-        except Exception as e:
-            logger.exception(f"Exception occurred while scraping {listing['url']}: {e}")
+        _dispatch_listing_scrape(listing)
+
+def _dispatch_listing_scrape(listing: dict) -> bool:
+    """Create a Scraping Agent listing job and track its Status. Returns True when the job was created."""
+    try:
+        payload = {
+            "webpage_url": listing['url'],
+            "priority": "low",
+            "type_page": "listing"
+        }
+        logger.info(f"Calling Scraping Agent for URL: {listing['url']}")
+        response = agent_session.post(
+            build_scraping_agent_url("scrape/"),
+            json=payload,
+            headers=headers,
+            timeout=SCRAPING_AGENT_TIMEOUT
+        )
+        if response.status_code == 200:
+            job_id = response.json().get('job_id')
+            logger.info(f"Scraping job created for {listing['url']}, job_id: {job_id}")
+
+            status = Status(
+                id=str(uuid.uuid4()),
+                ingestion_type="listing",
+                job_id=job_id,
+                status="processing",
+                entity_id=listing['id']
+            )
+            status_manager.create_status(status)
+            listing_manager.update_listing(
+                listing_id=listing['id'],
+                changes={'scrape_requested_at': datetime.now(timezone.utc)}
+            )
+            return True
+        logger.error(
+            f"Failed to call Scraping Agent for {listing['url']}. "
+            f"Status code: {response.status_code}, Response: {response.text}"
+        )
+    except Exception as e:
+        logger.exception(f"Exception occurred while scraping {listing['url']}: {e}")
+    return False
 
 @app.task(name="celery_worker.create_product_batches")
 def create_product_batches():
@@ -188,66 +257,377 @@ def create_product_batches():
 
     logger.info(f"[BATCH] Completed batching. {len(batches_created_or_updated)} batches created/updated.")
 
+def _dispatch_product_scrape(product_url_id: str, product_url: Optional[str] = None) -> bool:
+    """
+    Create a Scraping Agent product job for one ProductUrl and track its Status.
+    Returns True when the job was created.
+    """
+    try:
+        if not product_url:
+            product_url_doc = product_url_manager.get_product_url(product_url_id=product_url_id)
+            product_url = product_url_doc.get('url') if product_url_doc else None
+        if not product_url:
+            logger.warning(f"[BATCH] URL not found for ID: {product_url_id}")
+            return False
+
+        payload = {
+            "webpage_url": product_url,
+            "priority": "low",
+            "type_page": "product"
+        }
+
+        response = agent_session.post(
+            build_scraping_agent_url("scrape/"),
+            json=payload,
+            headers=headers,
+            timeout=SCRAPING_AGENT_TIMEOUT
+        )
+
+        if response.status_code == 200:
+            job_id = response.json().get('job_id')
+            logger.info(f"[BATCH] Scraping job created for {product_url_id}, job_id: {job_id}")
+            status = Status(
+                id=str(uuid.uuid4()),
+                ingestion_type="product",
+                job_id=job_id,
+                status="processing",
+                entity_id=product_url_id
+            )
+            status_manager.create_status(status)
+            return True
+        logger.error(
+            f"[BATCH] Failed to call Scraping Agent for {product_url_id}. "
+            f"Status code: {response.status_code}, Response: {response.text}"
+        )
+    except Exception as e:
+        logger.error(f"[BATCH] Exception while processing URL {product_url_id}: {e}")
+    return False
+
 @app.task(name="celery_worker.scrape_batch")
 def scrape_batch():
+    """
+    Spend one cycle's scrape budget on the ProductUrls most likely to have
+    changed since their last scrape (see ProductUrlManager.get_rescrape_candidates),
+    instead of re-scraping whole batches oldest first.
+    """
     if not is_scraping_agent_active():
         logger.warning("Scraping agent not active. Quitting task.")
         raise Ignore() 
-    batches_to_process = batch_manager.get_top_n_batches(MAXIMUM_BATCHES_TO_PROCESS)
-    
-    for batch in batches_to_process:
-        urls = batch.get('urls', [])
-        if not urls:
-            logger.warning(f"[BATCH] Batch {batch['id']} has no URLs to process.")
-            continue
-        
-        logger.info(f"[BATCH] Processing Batch {batch['id']} with {len(urls)} URLs.")
-        
-        for product_url_id in urls:
+    _dispatch_rescrapes(RESCRAPE_BUDGET_PER_CYCLE)
+
+def _dispatch_rescrapes(budget: int) -> int:
+    """Dispatch up to `budget` product re-scrapes, most likely stale first. Returns the number dispatched."""
+    candidates = product_url_manager.get_rescrape_candidates(budget)
+    if not candidates:
+        logger.info("[BATCH] No ProductUrls are due for a re-scrape.")
+        return 0
+
+    logger.info(f"[BATCH] Dispatching {len(candidates)} ProductUrls (budget {budget}).")
+    with ThreadPoolExecutor(max_workers=SCRAPING_AGENT_CONCURRENCY) as executor:
+        dispatched = list(executor.map(
+            _dispatch_product_scrape,
+            [candidate['id'] for candidate in candidates],
+            [candidate.get('url') for candidate in candidates],
+        ))
+
+    dispatched_candidates = [candidate for candidate, ok in zip(candidates, dispatched) if ok]
+    product_url_manager.mark_scrape_requested([candidate['id'] for candidate in dispatched_candidates])
+
+    # Batches remain the dashboard's grouping of URLs; keep their timestamp meaningful.
+    processed_at = str(datetime.now())
+    for batch_id in {candidate.get('batch_id') for candidate in dispatched_candidates if candidate.get('batch_id')}:
+        batch_manager.update_batch(batch_id=batch_id, changes={"last_processed": processed_at})
+    logger.info(f"[BATCH] Dispatched {len(dispatched_candidates)} of {len(candidates)} re-scrapes.")
+    return len(dispatched_candidates)
+
+def _process_status_result(status: dict) -> Optional[tuple]:
+    """
+    Poll one processing Status's job and ingest its result when it has finished.
+
+    Listing results are ingested here. A completed product job returns
+    (status_id, product_url_id, product payload) so fetch_results can write
+    all of the run's products in one batch; anything else returns None.
+    """
+    status_id = status['id']
+    job_id = status['job_id']
+    entity_id = status['entity_id']
+
+    try:
+        fetch_url = build_scraping_agent_url(f"scrape/{job_id}/status/")
+        logger.info(f"Fetching Status for Job-ID : {job_id}")
+
+        status_response = agent_session.get(fetch_url, headers=headers, timeout=SCRAPING_AGENT_TIMEOUT).json()
+        logger.info(f"Fetched Status for Job-ID : {job_id}")
+
+        job_status = status_response['status']
+        entity_type = status_response['type_page']
+
+        if job_status == 'completed':
             try:
-                product_url_doc = product_url_manager.get_product_url(product_url_id=product_url_id)
-                product_url = product_url_doc.get('url')
-                if not product_url:
-                    logger.warning(f"[BATCH] URL not found for ID: {product_url_id}")
-                    continue
-
-                payload = {
-                    "webpage_url": product_url,
-                    "priority": "low",
-                    "type_page": "product"
-                }
-
-                response = requests.post(
-                    build_scraping_agent_url("scrape/"),
-                    json=payload,
-                    headers=headers,
-                    timeout=20
-                )
+                fetch_result_url = build_scraping_agent_url(f"scrape/{job_id}/result/")
+                result_response = agent_session.get(fetch_result_url, headers=headers, timeout=SCRAPING_AGENT_TIMEOUT).json()
 
-                if response.status_code == 200:
-                    job_id = response.json().get('job_id')
-                    logger.info(f"[BATCH] Scraping job created for {product_url_id}, job_id: {job_id}")
-                    status = Status(
-                        id=str(uuid.uuid4()),
-                        ingestion_type="product",
-                        job_id=job_id,
-                        status="processing",
-                        entity_id=product_url_id
+                if entity_type == 'listing':
+                    source_id = listing_manager.get_listing(entity_id)['source_id']
+                    product_urls = result_response['result']['items']
+
+                    listing_manager.update_listing(
+                        listing_id=entity_id,
+                        changes={'last_listed': str(datetime.now())}
                     )
-                    status_manager.create_status(status)
-                else:
-                    logger.error(
-                        f"[BATCH] Failed to call Scraping Agent for {product_url_id}. "
-                        f"Status code: {response.status_code}, Response: {response.text}"
+
+                    # The unique url index makes concurrent results for the same URL insert it once.
+                    for product_url in product_urls:
+                        try:
+                            product_url_entity = ProductUrl(
+                                id=str(uuid.uuid4()),
+                                url=product_url['url'],
+                                source_id=source_id,
+                                listing_id=entity_id,
+                                page_index=product_url['page_rank']
+                            )
+                            product_url_manager.create_product_url(product_url_entity)
+                        except Exception as e:
+                            logger.error(f"[LISTING] Failed inserting ProductUrl {product_url['url']}: {e}")
+
+                    status_manager.update_status(status_id=status_id, changes={'status': 'completed'})
+
+                elif entity_type == 'product':
+                    product_result = result_response['result']
+                    product_url = product_result.get('url')
+                    if not product_url:
+                        status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+                        raise ValueError(f"Product scrape result missing URL for job: {job_id}")
+
+                    product_url_doc = product_url_manager.get_product_url(entity_id)
+                    if not product_url_doc:
+                        product_url_doc = product_url_manager.get_product_url_by_url(product_url)
+                    if not product_url_doc:
+                        status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+                        raise ValueError(f"No ProductUrl found for URL: {product_url}")
+
+                    return (
+                        status_id,
+                        product_url_doc['id'],
+                        {
+                            "title": product_result['title'],
+                            "price": product_result['price'],
+                            "url": product_url,
+                            "image_url": product_result['image_url'],
+                            "category": product_result.get('category'),
+                        },
                     )
+
+            except Exception as e:
+                logger.error(f"[RESULT PROCESSING] Failed for job {job_id}: {e}")
+                status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+
+        elif job_status == 'failed':
+            status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+
+    except Exception as e:
+        logger.error(f"[FETCH RESULTS] General failure for job {job_id}: {e}")
+        status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+    return None
+
+def _ingest_product_results(pending: list[tuple]) -> None:
+    """
+    Write the products of completed jobs with one upsert_products call per
+    MAXIMUM_BATCH_SIZE chunk, so category misses are resolved in bulk. If a
+    chunk fails, its products are retried one by one so only the bad ones fail.
+    `last_fetched` is stamped once for the whole run, not per chunk or product.
+    """
+    stored_any = False
+    for start in range(0, len(pending), MAXIMUM_BATCH_SIZE):
+        chunk = pending[start:start + MAXIMUM_BATCH_SIZE]
+        try:
+            stored_products = product_manager.upsert_products([payload for _, _, payload in chunk])
+        except Exception as e:
+            logger.warning(f"[RESULT PROCESSING] Batch of {len(chunk)} products failed, retrying one by one: {e}")
+            stored_products = None
+
+        for index, (status_id, product_url_id, payload) in enumerate(chunk):
+            try:
+                stored_product = (
+                    stored_products[index] if stored_products is not None
+                    else product_manager.upsert_product(payload)
+                )
+                stored_any = True
+                product_url_manager.record_scrape(product_url_id, stored_product['changed'])
+                status_manager.update_status(status_id=status_id, changes={'status': 'completed'})
             except Exception as e:
-                logger.error(f"[BATCH] Exception while processing URL {product_url_id}: {e}")
+                logger.error(f"[RESULT PROCESSING] Failed for product {payload.get('url')}: {e}")
+                status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+
+    if stored_any:
+        product_manager.record_catalog_changes(fetched=True, changed=False)
+
+"""
+Continuous scrape scheduler.
+
+Replaces the fixed 7/8/9 o'clock runs: every SCHEDULER_TICK_SECONDS one tick
+tops up a token bucket at SCRAPE_TARGET_RATE_PER_HOUR and spends it on due
+listings first, then on the stalest product URLs. Each tick dispatches only
+as many jobs as fit under SCRAPE_MAX_IN_FLIGHT processing Statuses,
+SCRAPE_MAX_QUEUE_DEPTH messages waiting in the agent's queues (from its
+/capacity endpoint, else read from Redis) and the agent's recent throughput.
+"""
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "300"))
+SCRAPE_TARGET_RATE_PER_HOUR = float(
+    os.getenv("SCRAPE_TARGET_RATE_PER_HOUR", str(RESCRAPE_BUDGET_PER_CYCLE * 2 / 24))
+)
+SCRAPE_MAX_IN_FLIGHT = int(os.getenv("SCRAPE_MAX_IN_FLIGHT", "200"))
+SCRAPE_MAX_QUEUE_DEPTH = int(os.getenv("SCRAPE_MAX_QUEUE_DEPTH", "50"))
+LISTING_REFRESH_HOURS = float(os.getenv("LISTING_REFRESH_HOURS", "12"))
+FETCH_RESULTS_INTERVAL_SECONDS = float(os.getenv("FETCH_RESULTS_INTERVAL_SECONDS", "300"))
+SCRAPING_AGENT_REDIS_URL = os.getenv("SCRAPING_AGENT_REDIS_URL", "").strip() or connection_link
+SCRAPING_AGENT_QUEUES = (
+    "scraping_agent_scrape_high",
+    "scraping_agent_scrape_medium",
+    "scraping_agent_scrape_low",
+)
+SCHEDULER_STATE_KEY = "data_ingestor:scheduler:state"
+SCHEDULER_LOCK_KEY = "data_ingestor:scheduler:lock"
+scheduler_redis = redis.Redis.from_url(SCRAPING_AGENT_REDIS_URL, socket_timeout=5)
 
-        batch_manager.update_batch(
-            batch_id=batch['id'],
-            changes={"last_processed": str(datetime.now())}
+def _agent_queue_depth() -> Optional[int]:
+    """Messages waiting in the Scraping Agent's Celery queues, or None if Redis is unreachable."""
+    try:
+        with scheduler_redis.pipeline(transaction=False) as pipe:
+            for queue in SCRAPING_AGENT_QUEUES:
+                pipe.llen(queue)
+            return sum(pipe.execute())
+    except redis.RedisError as e:
+        logger.warning(f"[SCHEDULER] Could not read agent queue depth: {e}")
+        return None
+
+def get_scraping_agent_capacity() -> Optional[dict]:
+    """
+    Fetch the agent's /capacity snapshot (queue depth, workers, recent throughput).
+    Returns None if the agent is unreachable or does not serve it. Does not raise exceptions.
+    """
+    try:
+        response = agent_session.get(
+            build_scraping_agent_url("capacity/"), headers=headers, timeout=SCRAPING_AGENT_TIMEOUT
         )
-        logger.info(f"[BATCH] Finished processing Batch {batch['id']}")
+        if response.status_code == 200:
+            return response.json()
+        logger.warning(f"[SCHEDULER] Capacity endpoint returned status code {response.status_code}.")
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"[SCHEDULER] Could not read agent capacity: {e}")
+    return None
+
+def _agent_headroom(capacity: dict) -> Optional[int]:
+    """
+    Jobs the agent can take this tick according to its /capacity snapshot, or
+    None if it reports nothing beyond queue depth. With no live workers nothing
+    is sent; with a backlog the queue is kept to about one tick of its recent throughput.
+    """
+    if capacity.get("workers") == 0:
+        return 0
+    throughput = capacity.get("throughput")
+    queued = int(capacity.get("queued", 0))
+    if not throughput or queued <= 0:
+        return None
+    drain_per_tick = float(throughput.get("per_minute", 0)) * SCHEDULER_TICK_SECONDS / 60
+    return int(drain_per_tick) - queued
+
+def _in_flight_jobs() -> int:
+    """
+    Statuses still processing, from the materialized dashboard counters once
+    they have been reconciled, otherwise counted from the Status collection.
+    """
+    status_stats = stats_manager.get_stats().get(STATUS_STATS_ID, {})
+    if status_stats.get("reconciled_at"):
+        counts = status_stats.get("counts", {})
+    else:
+        counts = status_manager.count_by_status()
+    return max(int(counts.get("processing", 0)), 0)
+
+def _take_scrape_tokens(limit: int) -> int:
+    """
+    Refill the token bucket for the time since the last tick and take up to
+    `limit` whole tokens. The bucket holds at most two ticks' worth, so time
+    spent blocked or stopped does not turn into a burst.
+    """
+    now = time.time()
+    state = scheduler_redis.hgetall(SCHEDULER_STATE_KEY)
+    tokens = float(state.get(b"tokens", 0))
+    updated_at = float(state.get(b"updated_at", now - SCHEDULER_TICK_SECONDS))
+    capacity = max(SCRAPE_TARGET_RATE_PER_HOUR * SCHEDULER_TICK_SECONDS * 2 / 3600, 1.0)
+    tokens = min(tokens + SCRAPE_TARGET_RATE_PER_HOUR * max(now - updated_at, 0) / 3600, capacity)
+    taken = max(min(int(tokens), limit), 0)
+    scheduler_redis.hset(SCHEDULER_STATE_KEY, mapping={"tokens": tokens - taken, "updated_at": now})
+    return taken
+
+def _return_scrape_tokens(count: int) -> None:
+    if count > 0:
+        scheduler_redis.hincrbyfloat(SCHEDULER_STATE_KEY, "tokens", count)
+
+def _listing_is_due(listing: dict, now: datetime) -> bool:
+    last_listed = listing.get('last_listed')
+    if isinstance(last_listed, str):
+        last_listed = datetime.fromisoformat(last_listed)
+    requested_at = listing.get('scrape_requested_at')
+    if requested_at is not None:
+        requested_at = requested_at.replace(tzinfo=timezone.utc) if requested_at.tzinfo is None else requested_at
+        in_flight = now - requested_at < timedelta(hours=RESCRAPE_IN_FLIGHT_HOURS)
+        # last_listed is written as naive local time by _process_status_result.
+        listed_after = last_listed is not None and last_listed.astimezone(timezone.utc) >= requested_at
+        if in_flight and not listed_after:
+            return False
+    if last_listed is None:
+        return True
+    return now - last_listed.astimezone(timezone.utc) >= timedelta(hours=LISTING_REFRESH_HOURS)
+
+@app.task(name="celery_worker.schedule_scrapes")
+def schedule_scrapes():
+    """One controller tick: batch new URLs, then dispatch the rate-limited, backpressured allowance."""
+    lock = scheduler_redis.lock(SCHEDULER_LOCK_KEY, timeout=SCHEDULER_TICK_SECONDS * 2)
+    if not lock.acquire(blocking=False):
+        logger.info("[SCHEDULER] Previous tick still running. Skipping.")
+        return
+    try:
+        capacity = get_scraping_agent_capacity()
+        if capacity is None:
+            # Older agents without /capacity: plain liveness check and direct queue read.
+            if not is_scraping_agent_active():
+                return
+            queue_depth = _agent_queue_depth()
+        else:
+            queue_depth = int(capacity.get("queued", 0))
+        create_product_batches()
+
+        in_flight = _in_flight_jobs()
+        headroom = SCRAPE_MAX_IN_FLIGHT - in_flight
+        if queue_depth is not None:
+            headroom = min(headroom, SCRAPE_MAX_QUEUE_DEPTH - queue_depth)
+        agent_headroom = _agent_headroom(capacity) if capacity is not None else None
+        if agent_headroom is not None:
+            headroom = min(headroom, agent_headroom)
+        allowance = _take_scrape_tokens(headroom)
+        logger.info(
+            f"[SCHEDULER] in_flight={in_flight} queue_depth={queue_depth} "
+            f"agent_headroom={agent_headroom} headroom={headroom} allowance={allowance}"
+        )
+        if allowance <= 0:
+            return
+
+        now = datetime.now(timezone.utc)
+        due_listings = [
+            listing for listing in listing_manager.get_oldest_listings_per_source()
+            if _listing_is_due(listing, now)
+        ][:allowance]
+        dispatched = sum(1 for listing in due_listings if _dispatch_listing_scrape(listing))
+        if allowance > dispatched:
+            dispatched += _dispatch_rescrapes(allowance - dispatched)
+        _return_scrape_tokens(allowance - dispatched)
+        logger.info(f"[SCHEDULER] Dispatched {dispatched} of {allowance} allowed jobs.")
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            pass
 
 @app.task(name="celery_worker.fetch_results")
 def fetch_results():
@@ -256,94 +636,36 @@ def fetch_results():
         raise Ignore() 
     processing_statuses = status_manager.get_status_by_status('processing')
 
-    for status in processing_statuses:
-        status_id = status['id']
-        job_id = status['job_id']
-        entity_id = status['entity_id']
-
-        try:
-            fetch_url = build_scraping_agent_url(f"scrape/{job_id}/status/")
-            logger.info(f"Fetching Status for Job-ID : {job_id}")
-
-            status_response = requests.get(fetch_url, headers=headers).json()
-            logger.info(f"Fetched Status for Job-ID : {job_id}")
-
-            job_status = status_response['status']
-            entity_type = status_response['type_page']
-
-            if job_status == 'completed':
-                try:
-                    fetch_result_url = build_scraping_agent_url(f"scrape/{job_id}/result/")
-                    result_response = requests.get(fetch_result_url, headers=headers).json()
-
-                    if entity_type == 'listing':
-                        source_id = listing_manager.get_listing(entity_id)['source_id']
-                        product_urls = result_response['result']['items']
-
-                        listing_manager.update_listing(
-                            listing_id=entity_id,
-                            changes={'last_listed': str(datetime.now())}
-                        )
-
-                        if not product_urls:
-                            status_manager.update_status(status_id=status_id, changes={'status': 'completed'})
-                        else:
-                            for product_url in product_urls:
-                                try:
-                                    if product_url_manager.product_url_exists(url=product_url['url']):
-                                        continue
-                                    product_url_entity = ProductUrl(
-                                        id=str(uuid.uuid4()),
-                                        url=product_url['url'],
-                                        source_id=source_id,
-                                        listing_id=entity_id,
-                                        page_index=product_url['page_rank']
-                                    )
-                                    product_url_manager.create_product_url(product_url_entity)
-                                except Exception as e:
-                                    logger.error(f"[LISTING] Failed inserting ProductUrl {product_url['url']}: {e}")
-
-                        status_manager.update_status(status_id=status_id, changes={'status': 'completed'})
-
-                    elif entity_type == 'product':
-                        product_result = result_response['result']
-                        product_url = product_result.get('url')
-                        if not product_url:
-                            status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
-                            raise ValueError(f"Product scrape result missing URL for job: {job_id}")
-
-                        product_url_doc = product_url_manager.get_product_url(entity_id)
-                        if not product_url_doc:
-                            product_url_doc = product_url_manager.get_product_url_by_url(product_url)
-                        if not product_url_doc:
-                            status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
-                            raise ValueError(f"No ProductUrl found for URL: {product_url}")
-
-                        try:
-                            product_manager.upsert_product(
-                                {
-                                    "title": product_result['title'],
-                                    "price": product_result['price'],
-                                    "url": product_url,
-                                    "image_url": product_result['image_url'],
-                                    "category": product_result.get('category'),
-                                }
-                            )
-                            status_manager.update_status(status_id=status_id, changes={'status': 'completed'})
-                        except Exception as e:
-                            logger.error(f"[RESULT PROCESSING] Failed for job {job_id}: {e}")
-                            status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
-
-                except Exception as e:
-                    logger.error(f"[RESULT PROCESSING] Failed for job {job_id}: {e}")
-                    status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+    # Each status is polled independently, bounded by the pool size.
+    with ThreadPoolExecutor(max_workers=SCRAPING_AGENT_CONCURRENCY) as executor:
+        pending_products = [
+            pending for pending in executor.map(_process_status_result, processing_statuses) if pending
+        ]
+    _ingest_product_results(pending_products)
 
-            elif job_status == 'failed':
-                status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
-
-        except Exception as e:
-            logger.error(f"[FETCH RESULTS] General failure for job {job_id}: {e}")
-            status_manager.update_status(status_id=status_id, changes={'status': 'failed'})
+@app.task(name="celery_worker.reconcile_stats")
+def reconcile_stats():
+    """
+    Recompute the materialized dashboard counters from the source collections
+    to correct drift from failed or concurrent $inc updates, re-count the
+    backend's CatalogMetadata total_products and rebuild its category stats.
+    """
+    status_counts = status_manager.count_by_status()
+    product_url_counts = {
+        item["source_id"]: item["count"] for item in product_url_manager.count_by_source()
+    }
+    batch_totals = batch_manager.get_batch_totals()
+    stats_manager.reconcile(
+        status_counts=status_counts,
+        product_url_counts=product_url_counts,
+        batch_count=batch_totals["count"],
+        batched_urls=batch_totals["batched_urls"],
+    )
+    logger.info("[STATS] Ingestion stats reconciled.")
+    product_count = product_manager.reconcile_catalog_metadata()
+    logger.info(f"[STATS] Catalog metadata reconciled: {product_count} products.")
+    changed_categories = product_manager.reconcile_category_stats()
+    logger.info(f"[STATS] Category stats reconciled: {changed_categories} rows changed.")
 
 """
 Creating Celery Beat to trigger a function call in a fixed schedules.
@@ -351,43 +673,22 @@ Creating Celery Beat to trigger a function call in a fixed schedules.
 app.conf.timezone = "Asia/Kolkata"
 app.conf.enable_utc = False
 app.conf.beat_schedule = {
-    # Every day at 7:00 AM IST
-    "daily-task-7am": {
-        "task": "celery_worker.start_scraping_listing",
-        "schedule": crontab(hour=7, minute=0),
-    },
-    # Every day at 7:00 PM IST
-    "daily-task-7pm": {
-        "task": "celery_worker.start_scraping_listing",
-        "schedule": crontab(hour=19, minute=0),
+    # Steady-state scrape controller (listings, batching and product re-scrapes).
+    "scrape-scheduler-tick": {
+        "task": "celery_worker.schedule_scrapes",
+        "schedule": SCHEDULER_TICK_SECONDS,
     },
 
-    # Every day at 8:00 AM IST
-    "daily-task-8am": {
-        "task": "celery_worker.create_product_batches",
-        "schedule": crontab(hour=8, minute=0),
-    },
-    # Every day at 8:00 PM IST
-    "daily-task-8pm": {
-        "task": "celery_worker.create_product_batches",
-        "schedule": crontab(hour=20, minute=0),
-    },
-
-    # Every day at 9:00 AM IST
-    "daily-task-9am": {
-        "task": "celery_worker.scrape_batch",
-        "schedule": crontab(hour=9, minute=0),
-    },
-    # Every day at 9:00 PM IST
-    "daily-task-9pm": {
-        "task": "celery_worker.scrape_batch",
-        "schedule": crontab(hour=21, minute=0),
+    # Frees in-flight capacity for the scheduler as results come in.
+    "fetch-results": {
+        "task": "celery_worker.fetch_results",
+        "schedule": FETCH_RESULTS_INTERVAL_SECONDS,
     },
 
-    # Every 15 minutes
-    "task-every-15-minutes": {
-        "task": "celery_worker.fetch_results",
-        "schedule": 900.0,
+    # Every hour at minute 30
+    "hourly-stats-reconcile": {
+        "task": "celery_worker.reconcile_stats",
+        "schedule": crontab(minute=30),
     },
 }
 
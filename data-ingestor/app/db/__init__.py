@@ -4,6 +4,7 @@ from .product_url import ProductUrlManager
 from .status import StatusManager
 from .batch import BatchManager
 from .product import ProductManager
+from .stats import StatsManager
 
 __all__ = [
     "SourceManager",
@@ -11,5 +12,6 @@ __all__ = [
     "ProductUrlManager",
     "StatusManager",
     "BatchManager",
-    "ProductManager"
+    "ProductManager",
+    "StatsManager",
 ]
\ No newline at end of file
@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 from app.models import Batch
 
 from app.utils import get_db
+from app.db.stats import StatsManager
 
 load_dotenv()
 
@@ -22,11 +23,13 @@ class BatchManager:
     def __init__(self):
         self.db = get_db()
         self.collection = self.db[BATCHES_COLLECTION_NAME]
+        self.stats = StatsManager()
 
     def create_batch(self, batch: Batch) -> None:
         try:
             logging.info(f"[CREATE] Inserting Batch: {batch.id}")
             self.collection.insert_one(batch.model_dump(mode="json"))
+            self.stats.record_batch(count_delta=1, urls_delta=batch.batch_size)
             logging.info(f"[CREATE] Successfully inserted Batch: {batch.id}")
         except Exception as e:
             logging.error(f"[CREATE] Failed to insert Batch {getattr(batch, 'id', '')}: {e}")
@@ -115,6 +118,7 @@ class BatchManager:
                 }
             )
             if result.matched_count == 1:
+                self.stats.record_batch(urls_delta=1)
                 logging.info(f"[UPDATE] Successfully added ProductUrl '{product_url_id}' to Batch: {batch_id}")
             else:
                 logging.warning(f"[UPDATE] Batch not found for adding ProductUrl: {batch_id}")
@@ -139,8 +143,9 @@ class BatchManager:
     def delete_batch(self, batch_id: str) -> None:
         try:
             logging.info(f"[DELETE] Deleting Batch with ID: {batch_id}")
-            result = self.collection.delete_one({"id": batch_id})
-            if result.deleted_count == 1:
+            deleted = self.collection.find_one_and_delete({"id": batch_id}, projection={"batch_size": 1})
+            if deleted:
+                self.stats.record_batch(count_delta=-1, urls_delta=-deleted.get("batch_size", 0))
                 logging.info(f"[DELETE] Successfully deleted Batch: {batch_id}")
             else:
                 logging.warning(f"[DELETE] Batch not found for deletion: {batch_id}")
@@ -212,3 +217,44 @@ class BatchManager:
         except Exception as e:
             logging.error(f"[READ] Failed to fetch top {n} batches: {e}")
             raise
+
+    def get_batches_page(self, page: int = 1, page_size: int = 50) -> list[dict]:
+        """
+        Fetch one page of Batches, newest first.
+
+        Args:
+            page (int): 1-based page number.
+            page_size (int): Number of batches per page.
+
+        Returns:
+            list[dict]: Batch documents for the requested page.
+        """
+        try:
+            logging.info(f"[READ] Fetching Batch page {page} (page_size={page_size})")
+            results = list(
+                self.collection.find()
+                .sort("$natural", -1)
+                .skip((max(page, 1) - 1) * page_size)
+                .limit(page_size)
+            )
+            logging.info(f"[READ] Batches fetched for page {page}: {len(results)}")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to fetch Batch page {page}: {e}")
+            raise
+
+    def get_batch_totals(self) -> dict:
+        """
+        Aggregate the number of batches and the URLs they hold.
+
+        Returns:
+            dict: {"count": int, "batched_urls": int}
+        """
+        try:
+            logging.info("[READ] Aggregating Batch totals")
+            pipeline = [{"$group": {"_id": None, "count": {"$sum": 1}, "batched_urls": {"$sum": "$batch_size"}}}]
+            totals = next(self.collection.aggregate(pipeline), None) or {}
+            return {"count": totals.get("count", 0), "batched_urls": totals.get("batched_urls", 0)}
+        except Exception as e:
+            logging.error(f"[READ] Failed to aggregate Batch totals: {e}")
+            raise
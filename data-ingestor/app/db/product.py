@@ -1,8 +1,12 @@
+import hashlib
+import json
 import logging
 import os
+import threading
 import uuid
+from datetime import datetime, timezone
 from typing import Any, List, Optional
-from urllib.parse import parse_qs, unquote, urlparse
+from urllib.parse import parse_qs, unquote, urlparse, urlsplit, urlunsplit
 
 from dotenv import load_dotenv
 
@@ -23,6 +27,26 @@ logging.basicConfig(
 )
 
 DEFAULT_CATEGORY_NAME = "Uncategorized"
+CATALOG_VERSION_KEY = "catalog_version"
+CATALOG_TOTAL_PRODUCTS_KEY = "total_products"
+CATALOG_LAST_FETCHED_KEY = "last_fetched"
+FOREIGN_KEY_VIOLATION = "23503"
+# Keep in sync with HISTOGRAM_BUCKETS in backend/api/migrations/0010_category_stats.py.
+CATEGORY_HISTOGRAM_BUCKETS = 10
+
+
+def normalize_product_url(url: Optional[str]) -> str:
+    """
+    Canonical form of a product URL as stored in api_product.url.
+
+    Lowercases scheme and host, drops the fragment and surrounding whitespace.
+    Keep in sync with backend/api/migrations/0005_deduplicate_product_urls.py.
+    """
+    value = str(url or "").strip()
+    parts = urlsplit(value)
+    if not parts.scheme or not parts.netloc:
+        return value
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
 
 
 class ProductManager:
@@ -30,6 +54,9 @@ class ProductManager:
 
     def __init__(self, database_url: Optional[str] = None):
         self.database_url = database_url or os.getenv("DATABASE_URL")
+        self._category_cache: dict[str, str] = {}
+        self._category_cache_warm = False
+        self._category_cache_lock = threading.Lock()
 
     def _connect(self):
         if psycopg2 is None:
@@ -67,95 +94,526 @@ class ProductManager:
         return {
             "title": data["title"],
             "price": float(data["price"]),
-            "url": str(data["url"]),
+            "url": normalize_product_url(data["url"]),
             "image_url": str(data["image_url"]),
             "category": category_name,
         }
 
+    @staticmethod
+    def _content_hash(payload: dict[str, Any]) -> str:
+        """Digest of the scraped fields stored on api_product; equal hashes mean nothing to write."""
+        content = json.dumps(
+            [payload["title"], payload["price"], payload["image_url"], payload["category"]],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _category_name(category_name: Optional[str]) -> str:
+        return str(category_name or "").strip() or DEFAULT_CATEGORY_NAME
+
+    def _load_category_cache(self, cursor) -> int:
+        cursor.execute("SELECT id, name FROM api_category")
+        categories = {row["name"]: str(row["id"]) for row in cursor.fetchall()}
+        with self._category_cache_lock:
+            self._category_cache = categories
+            self._category_cache_warm = True
+        logging.info("[CACHE] Loaded %s categories", len(categories))
+        return len(categories)
+
+    def warm_category_cache(self) -> int:
+        """Load every api_category row into the in-process name -> id cache."""
+        try:
+            with self._connect() as connection:
+                with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                    return self._load_category_cache(cursor)
+        except Exception as e:
+            logging.error("[CACHE] Failed to load categories: %s", e)
+            raise
+
+    def invalidate_category_cache(self) -> None:
+        """Drop cached category ids; the next write reloads them from api_category."""
+        with self._category_cache_lock:
+            self._category_cache = {}
+            self._category_cache_warm = False
+        logging.info("[CACHE] Category cache invalidated")
+
+    def _resolve_categories(self, cursor, category_names: List[Optional[str]]) -> dict[str, str]:
+        """
+        Map category names to api_category ids, creating missing categories.
+
+        Cached names cost nothing; all misses are inserted with a single
+        INSERT ... ON CONFLICT statement and added to the cache.
+        """
+        if not self._category_cache_warm:
+            self._load_category_cache(cursor)
+
+        names = list(dict.fromkeys(self._category_name(name) for name in category_names))
+        with self._category_cache_lock:
+            resolved = {name: self._category_cache[name] for name in names if name in self._category_cache}
+
+        missing = [name for name in names if name not in resolved]
+        if missing:
+            cursor.execute(
+                """
+                INSERT INTO api_category (id, name)
+                SELECT * FROM unnest(%s::uuid[], %s::text[])
+                ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                RETURNING id, name
+                """,
+                ([str(uuid.uuid4()) for _ in missing], missing),
+            )
+            created = {row["name"]: str(row["id"]) for row in cursor.fetchall()}
+            with self._category_cache_lock:
+                self._category_cache.update(created)
+            resolved.update(created)
+        return resolved
+
     def _get_or_create_category(self, cursor, category_name: Optional[str]) -> str:
-        name = str(category_name or "").strip() or DEFAULT_CATEGORY_NAME
+        name = self._category_name(category_name)
+        return self._resolve_categories(cursor, [name])[name]
+
+    @staticmethod
+    def _upsert_product_row(
+        cursor,
+        payload: dict[str, Any],
+        category_id: str,
+        content_hash: str,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Insert or update one product; returns None when the stored content hash
+        already matches, in which case the row is left untouched.
+        """
         cursor.execute(
             """
-            INSERT INTO api_category (id, name)
-            VALUES (%s, %s)
-            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
-            RETURNING id
+            INSERT INTO api_product (
+                id,
+                title,
+                price,
+                url,
+                image_url,
+                category_id,
+                content_hash
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (url) DO UPDATE SET
+                title = EXCLUDED.title,
+                price = EXCLUDED.price,
+                image_url = EXCLUDED.image_url,
+                category_id = EXCLUDED.category_id,
+                content_hash = EXCLUDED.content_hash
+            WHERE api_product.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING id, title, price, url, image_url, category_id, (xmax = 0) AS inserted
             """,
-            (str(uuid.uuid4()), name),
+            (
+                str(uuid.uuid4()),
+                payload["title"],
+                payload["price"],
+                payload["url"],
+                payload["image_url"],
+                category_id,
+                content_hash,
+            ),
         )
-        return str(cursor.fetchone()["id"])
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        logging.info("[UPSERT] Product stored for URL: %s", payload["url"])
+        return dict(row)
 
-    def upsert_product(self, product: Product | dict[str, Any]) -> dict[str, Any]:
-        """Insert or update a real app product using URL as the idempotency key."""
-        payload = self._product_payload(product)
+    @staticmethod
+    def _record_price_history(cursor, prices: List[tuple]) -> None:
+        """Append (product_id, price) rows to api_productpricehistory."""
+        if not prices:
+            return
+        values = []
+        for product_id, price in prices:
+            values.extend([str(product_id), price])
+        cursor.execute(
+            f"""
+            INSERT INTO api_productpricehistory (product_id, price, recorded_at)
+            VALUES {", ".join(["(%s, %s, NOW())"] * len(prices))}
+            """,
+            values,
+        )
+
+    @staticmethod
+    def _record_catalog_write(
+        cursor,
+        product_delta: int = 0,
+        fetched: bool = False,
+        changed: bool = True,
+    ) -> None:
+        """
+        Maintain the backend's api_catalogmetadata rows for a product write.
+
+        Bumps `catalog_version` (the backend's response cache key) unless the
+        write `changed` nothing, adds `product_delta` to `total_products` and,
+        once per ingest run, stamps `last_fetched`. Rows are written in key order so
+        concurrent writers lock them in the same order.
+        """
+        rows = {}
+        if changed:
+            rows[CATALOG_VERSION_KEY] = 1
+        if product_delta:
+            rows[CATALOG_TOTAL_PRODUCTS_KEY] = product_delta
+        if fetched:
+            rows[CATALOG_LAST_FETCHED_KEY] = datetime.now(timezone.utc).isoformat()
+        if not rows:
+            return
+
+        keys = sorted(rows)
+        values = []
+        for key in keys:
+            values.extend([key, json.dumps(rows[key])])
+        cursor.execute(
+            f"""
+            INSERT INTO api_catalogmetadata (key, value, updated_at)
+            VALUES {", ".join(["(%s, %s::jsonb, NOW())"] * len(keys))}
+            ON CONFLICT (key) DO UPDATE SET
+                value = CASE
+                    WHEN api_catalogmetadata.key = %s THEN EXCLUDED.value
+                    ELSE to_jsonb(GREATEST(
+                        COALESCE((api_catalogmetadata.value #>> '{{}}')::bigint, 0)
+                        + (EXCLUDED.value #>> '{{}}')::bigint,
+                        0
+                    ))
+                END,
+                updated_at = NOW()
+            """,
+            (*values, CATALOG_LAST_FETCHED_KEY),
+        )
+
+    def record_catalog_changes(
+        self,
+        product_delta: int = 0,
+        fetched: bool = False,
+        changed: bool = True,
+    ) -> None:
+        """
+        Apply `_record_catalog_write` in its own short transaction.
+
+        Product writes call this once per batch after their own transaction has
+        committed, so the shared api_catalogmetadata rows are locked only for
+        this one statement instead of for the whole write. Readers may see new
+        products under the previous version for that moment.
+
+        Failures are logged rather than raised, since the products are already
+        stored; the hourly reconcile corrects `total_products`.
+        """
         try:
             with self._connect() as connection:
-                with connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s)::bigint)", (payload["url"],))
-                    category_id = self._get_or_create_category(cursor, payload["category"])
-                    cursor.execute(
-                        """
-                        SELECT id
-                        FROM api_product
-                        WHERE url = %s
-                        ORDER BY id::text
-                        LIMIT 1
-                        FOR UPDATE
-                        """,
-                        (payload["url"],),
+                with connection.cursor() as cursor:
+                    self._record_catalog_write(
+                        cursor, product_delta=product_delta, fetched=fetched, changed=changed
                     )
-                    existing_product = cursor.fetchone()
+        except Exception as e:
+            logging.error("[UPDATE] Failed to update catalog metadata: %s", e)
 
-                    if existing_product:
-                        cursor.execute(
-                            """
-                            UPDATE api_product
-                            SET
-                                title = %s,
-                                price = %s,
-                                image_url = %s,
-                                category_id = %s
-                            WHERE id = %s
-                            RETURNING id, title, price, url, image_url, category_id
-                            """,
-                            (
-                                payload["title"],
-                                payload["price"],
-                                payload["image_url"],
-                                category_id,
-                                existing_product["id"],
-                            ),
+    @staticmethod
+    def _price_histogram(min_price: float, max_price: float, bucket_counts: dict[int, int]) -> List[dict]:
+        """Equal-width buckets between min and max price; `bucket_counts` is keyed by 1-based bucket."""
+        bucket_count = CATEGORY_HISTOGRAM_BUCKETS if max_price > min_price else 1
+        width = (max_price - min_price) / bucket_count
+        return [
+            {
+                "min": min_price + width * index,
+                "max": max_price if index == bucket_count - 1 else min_price + width * (index + 1),
+                "count": bucket_counts.get(index + 1, 0),
+            }
+            for index in range(bucket_count)
+        ]
+
+    @staticmethod
+    def _add_category_delta(
+        deltas: dict[str, dict[str, Any]],
+        category_id,
+        count: int = 0,
+        price: Optional[float] = None,
+    ) -> None:
+        """Accumulate a product count change and a stored price for one category."""
+        entry = deltas.setdefault(str(category_id), {"count": 0, "min": None, "max": None})
+        entry["count"] += count
+        if price is not None:
+            entry["min"] = price if entry["min"] is None else min(entry["min"], price)
+            entry["max"] = price if entry["max"] is None else max(entry["max"], price)
+
+    @staticmethod
+    def _apply_category_deltas(cursor, deltas: dict[str, dict[str, Any]]) -> None:
+        """
+        Apply accumulated count and price-bound deltas to api_categorystats.
+
+        Writes touch only the rows of their categories and never scan
+        api_product. Bounds only widen: a removed or lowered price leaves them
+        as they were, and `price_histogram` is left alone, until
+        `reconcile_category_stats` rebuilds every row exactly. New rows start
+        with an empty histogram and rows whose count reaches 0 are removed.
+        Rows are written in id order so concurrent writers lock them in the
+        same order.
+        """
+        deltas = {
+            category_id: entry
+            for category_id, entry in deltas.items()
+            if entry["count"] or entry["min"] is not None
+        }
+        if not deltas:
+            return
+        category_ids = sorted(deltas)
+        values = []
+        for category_id in category_ids:
+            entry = deltas[category_id]
+            values.extend([category_id, entry["count"], entry["min"], entry["max"]])
+        cursor.execute(
+            f"""
+            WITH deltas (category_id, product_count, min_price, max_price) AS (
+                VALUES {", ".join(["(%s::uuid, %s::integer, %s::double precision, %s::double precision)"] * len(category_ids))}
+            )
+            INSERT INTO api_categorystats (
+                category_id,
+                product_count,
+                min_price,
+                max_price,
+                price_histogram,
+                updated_at
+            )
+            SELECT category_id, GREATEST(product_count, 0), min_price, max_price, '[]'::jsonb, NOW()
+            FROM deltas
+            ORDER BY category_id
+            ON CONFLICT (category_id) DO UPDATE SET
+                product_count = GREATEST(
+                    api_categorystats.product_count
+                    + (SELECT d.product_count FROM deltas d WHERE d.category_id = EXCLUDED.category_id),
+                    0
+                ),
+                min_price = LEAST(api_categorystats.min_price, EXCLUDED.min_price),
+                max_price = GREATEST(api_categorystats.max_price, EXCLUDED.max_price),
+                updated_at = NOW()
+            """,
+            values,
+        )
+        cursor.execute(
+            "DELETE FROM api_categorystats WHERE category_id = ANY(%s::uuid[]) AND product_count = 0",
+            (category_ids,),
+        )
+
+    @classmethod
+    def _refresh_category_stats(cls, cursor, category_ids: Optional[List[str]] = None) -> int:
+        """
+        Recompute the backend's api_categorystats rows, histograms included, from api_product.
+
+        Only `category_ids` are touched (every category when None) with one
+        grouped scan via the (category_id, price) index. Product writes use
+        `_apply_category_deltas` instead; this is the exact rebuild behind
+        `reconcile_category_stats`. Categories left without products lose their
+        row. Rows are written in id order so concurrent writers lock them in the
+        same order.
+
+        Returns:
+            int: Number of rows inserted, changed or removed.
+        """
+        if category_ids is not None:
+            category_ids = sorted({str(category_id) for category_id in category_ids if category_id})
+            if not category_ids:
+                return 0
+        else:
+            cursor.execute("SELECT id FROM api_category")
+            category_ids = sorted(
+                str(row["id"] if isinstance(row, dict) else row[0]) for row in cursor.fetchall()
+            )
+
+        cursor.execute(
+            """
+            WITH bounds AS (
+                SELECT
+                    category_id,
+                    COUNT(*) AS product_count,
+                    MIN(price) AS min_price,
+                    MAX(price) AS max_price
+                FROM api_product
+                WHERE category_id = ANY(%s::uuid[])
+                GROUP BY category_id
+            )
+            SELECT
+                b.category_id,
+                b.product_count,
+                b.min_price,
+                b.max_price,
+                CASE
+                    WHEN b.max_price > b.min_price
+                        THEN LEAST(width_bucket(p.price, b.min_price, b.max_price, %s), %s)
+                    ELSE 1
+                END AS bucket,
+                COUNT(*) AS bucket_count
+            FROM api_product p
+            JOIN bounds b ON b.category_id = p.category_id
+            GROUP BY 1, 2, 3, 4, 5
+            """,
+            (category_ids, CATEGORY_HISTOGRAM_BUCKETS, CATEGORY_HISTOGRAM_BUCKETS),
+        )
+        stats: dict[str, dict[str, Any]] = {}
+        for row in cursor.fetchall():
+            category_id, product_count, min_price, max_price, bucket, bucket_count = (
+                tuple(row.values()) if isinstance(row, dict) else row
+            )
+            entry = stats.setdefault(
+                str(category_id),
+                {"product_count": product_count, "min_price": min_price, "max_price": max_price, "buckets": {}},
+            )
+            entry["buckets"][bucket] = bucket_count
+
+        changed = 0
+        if stats:
+            values = []
+            for category_id in sorted(stats):
+                entry = stats[category_id]
+                values.extend([
+                    category_id,
+                    entry["product_count"],
+                    entry["min_price"],
+                    entry["max_price"],
+                    json.dumps(cls._price_histogram(entry["min_price"], entry["max_price"], entry["buckets"])),
+                ])
+            cursor.execute(
+                f"""
+                INSERT INTO api_categorystats (
+                    category_id,
+                    product_count,
+                    min_price,
+                    max_price,
+                    price_histogram,
+                    updated_at
+                )
+                VALUES {", ".join(["(%s, %s, %s, %s, %s::jsonb, NOW())"] * len(stats))}
+                ON CONFLICT (category_id) DO UPDATE SET
+                    product_count = EXCLUDED.product_count,
+                    min_price = EXCLUDED.min_price,
+                    max_price = EXCLUDED.max_price,
+                    price_histogram = EXCLUDED.price_histogram,
+                    updated_at = NOW()
+                WHERE (
+                    api_categorystats.product_count,
+                    api_categorystats.min_price,
+                    api_categorystats.max_price,
+                    api_categorystats.price_histogram
+                ) IS DISTINCT FROM (
+                    EXCLUDED.product_count,
+                    EXCLUDED.min_price,
+                    EXCLUDED.max_price,
+                    EXCLUDED.price_histogram
+                )
+                """,
+                values,
+            )
+            changed += cursor.rowcount
+
+        empty = [category_id for category_id in category_ids if category_id not in stats]
+        if empty:
+            cursor.execute(
+                "DELETE FROM api_categorystats WHERE category_id = ANY(%s::uuid[])",
+                (empty,),
+            )
+            changed += cursor.rowcount
+        return changed
+
+    def upsert_products(self, products: List[Product | dict[str, Any]]) -> List[dict[str, Any]]:
+        """
+        Upsert several products in one transaction, resolving their categories in bulk.
+
+        Products whose content hash matches the stored row are skipped without an
+        UPDATE; each result's `changed` says whether its row was written. A changed
+        or new price is appended to api_productpricehistory.
+        A foreign-key violation means a cached category id no longer exists, so the
+        cache is dropped and the batch is retried once.
+        """
+        payloads = [self._product_payload(product) for product in products]
+        if not payloads:
+            return []
+
+        for attempt in range(2):
+            try:
+                with self._connect() as connection:
+                    with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                        category_ids = self._resolve_categories(
+                            cursor, [payload["category"] for payload in payloads]
                         )
-                    else:
                         cursor.execute(
                             """
-                            INSERT INTO api_product (
-                                id,
-                                title,
-                                price,
-                                url,
-                                image_url,
-                                category_id
-                            )
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                            RETURNING id, title, price, url, image_url, category_id
+                            SELECT id, title, price, url, image_url, category_id, content_hash
+                            FROM api_product
+                            WHERE url = ANY(%s)
                             """,
-                            (
-                                str(uuid.uuid4()),
-                                payload["title"],
-                                payload["price"],
-                                payload["url"],
-                                payload["image_url"],
-                                category_id,
-                            ),
+                            ([payload["url"] for payload in payloads],),
                         )
+                        stored = {row["url"]: dict(row) for row in cursor.fetchall()}
+
+                        results = []
+                        category_deltas: dict[str, dict[str, Any]] = {}
+                        price_changes = []
+                        inserted = 0
+                        written = 0
+                        for payload in payloads:
+                            content_hash = self._content_hash(payload)
+                            previous = stored.get(payload["url"])
+                            result = None
+                            if previous is None or previous["content_hash"] != content_hash:
+                                result = self._upsert_product_row(
+                                    cursor, payload, category_ids[payload["category"]], content_hash
+                                )
+                            if result is None:
+                                if previous is None:
+                                    # A concurrent writer stored the same content first.
+                                    cursor.execute(
+                                        "SELECT id, title, price, url, image_url, category_id FROM api_product WHERE url = %s",
+                                        (payload["url"],),
+                                    )
+                                    previous = dict(cursor.fetchone())
+                                unchanged = {key: value for key, value in previous.items() if key != "content_hash"}
+                                results.append({**unchanged, "changed": False})
+                                continue
+
+                            written += 1
+                            is_insert = result.pop("inserted")
+                            inserted += 1 if is_insert else 0
+                            if previous is not None and str(previous["category_id"]) != str(result["category_id"]):
+                                self._add_category_delta(category_deltas, previous["category_id"], count=-1)
+                                self._add_category_delta(category_deltas, result["category_id"], count=1, price=result["price"])
+                            else:
+                                # previous is None without an insert: a concurrent writer stored
+                                # the row first; its count is already in the stats.
+                                self._add_category_delta(
+                                    category_deltas, result["category_id"], count=1 if is_insert else 0, price=result["price"]
+                                )
+                            if previous is None or previous["price"] != result["price"]:
+                                price_changes.append((result["id"], result["price"]))
+                            stored[payload["url"]] = {**result, "content_hash": content_hash}
+                            results.append({**result, "changed": True})
+
+                        self._record_price_history(cursor, price_changes)
+                        self._apply_category_deltas(cursor, category_deltas)
+                logging.info(
+                    "[UPSERT] %s of %s products written, %s price changes",
+                    written,
+                    len(payloads),
+                    len(price_changes),
+                )
+            except Exception as e:
+                if getattr(e, "pgcode", None) == FOREIGN_KEY_VIOLATION and attempt == 0:
+                    logging.warning("[UPSERT] Stale category cache, retrying: %s", e)
+                    self.invalidate_category_cache()
+                    continue
+                logging.error(
+                    "[UPSERT] Failed to store Products %s: %s",
+                    [payload["url"] for payload in payloads],
+                    e,
+                )
+                raise
+            if written:
+                self.record_catalog_changes(product_delta=inserted)
+            return results
 
-                    result = dict(cursor.fetchone())
-                    logging.info("[UPSERT] Product stored for URL: %s", payload["url"])
-                    return result
-        except Exception as e:
-            logging.error("[UPSERT] Failed to store Product %s: %s", payload.get("url"), e)
-            raise
+    def upsert_product(self, product: Product | dict[str, Any]) -> dict[str, Any]:
+        """Insert or update a real app product using URL as the idempotency key."""
+        return self.upsert_products([product])[0]
 
     def create_product(self, product: Product | dict[str, Any]) -> dict[str, Any]:
         """Compatibility wrapper: product writes are upserts into api_product."""
@@ -167,7 +625,7 @@ class ProductManager:
             raise ValueError("product_id or url is required")
 
         where_clause = "p.url = %s" if url else "p.id::text = %s"
-        value = url or product_id
+        value = normalize_product_url(url) if url else product_id
 
         try:
             with self._connect() as connection:
@@ -185,8 +643,6 @@ class ProductManager:
                         FROM api_product p
                         JOIN api_category c ON c.id = p.category_id
                         WHERE {where_clause}
-                        ORDER BY p.id::text
-                        LIMIT 1
                         """,
                         (value,),
                     )
@@ -222,7 +678,12 @@ class ProductManager:
             raise
 
     def update_product(self, product_id: str, changes: dict) -> None:
-        """Update supported api_product fields by UUID."""
+        """
+        Update supported api_product fields by UUID.
+
+        Clears the content hash so the next scrape of the product is written in
+        full, and records a price change in api_productpricehistory.
+        """
         allowed_fields = ("title", "price", "url", "image_url")
         assignments = []
         values = []
@@ -230,7 +691,7 @@ class ProductManager:
         for field in allowed_fields:
             if field in changes:
                 assignments.append(f"{field} = %s")
-                values.append(changes[field])
+                values.append(normalize_product_url(changes[field]) if field == "url" else changes[field])
 
         try:
             with self._connect() as connection:
@@ -245,24 +706,67 @@ class ProductManager:
                         logging.info("[UPDATE] No supported Product changes for %s", product_id)
                         return
 
+                    assignments.append("content_hash = ''")
                     values.append(product_id)
-                    query = f"UPDATE api_product SET {', '.join(assignments)} WHERE id::text = %s"
-                    cursor.execute(query, values)
+                    cursor.execute(
+                        f"""
+                        UPDATE api_product p
+                        SET {', '.join(assignments)}
+                        FROM api_product previous
+                        WHERE previous.id = p.id AND p.id::text = %s
+                        RETURNING
+                            p.id,
+                            previous.price AS previous_price,
+                            p.price,
+                            previous.category_id AS previous_category_id,
+                            p.category_id
+                        """,
+                        values,
+                    )
+                    row = cursor.fetchone()
+                    if row and row["previous_price"] != row["price"]:
+                        self._record_price_history(cursor, [(row["id"], row["price"])])
+                    category_deltas: dict[str, dict[str, Any]] = {}
+                    if row and row["previous_category_id"] != row["category_id"]:
+                        self._add_category_delta(category_deltas, row["previous_category_id"], count=-1)
+                        self._add_category_delta(category_deltas, row["category_id"], count=1, price=row["price"])
+                    elif row and row["previous_price"] != row["price"]:
+                        self._add_category_delta(category_deltas, row["category_id"], price=row["price"])
+                    self._apply_category_deltas(cursor, category_deltas)
                     logging.info("[UPDATE] Product updated: %s", product_id)
         except Exception as e:
+            if getattr(e, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+                self.invalidate_category_cache()
             logging.error("[UPDATE] Failed to update Product %s: %s", product_id, e)
             raise
+        self.record_catalog_changes()
 
     def delete_product(self, product_id: str) -> None:
         """Delete a real app product by UUID."""
         try:
             with self._connect() as connection:
                 with connection.cursor() as cursor:
-                    cursor.execute("DELETE FROM api_product WHERE id::text = %s", (product_id,))
+                    # api_productpricehistory's FK is not ON DELETE CASCADE (Django
+                    # cascades in Python), so its rows go first.
+                    cursor.execute(
+                        "DELETE FROM api_productpricehistory WHERE product_id::text = %s",
+                        (product_id,),
+                    )
+                    cursor.execute(
+                        "DELETE FROM api_product WHERE id::text = %s RETURNING category_id",
+                        (product_id,),
+                    )
+                    deleted_categories = [row[0] for row in cursor.fetchall()]
+                    category_deltas: dict[str, dict[str, Any]] = {}
+                    for category_id in deleted_categories:
+                        self._add_category_delta(category_deltas, category_id, count=-1)
+                    self._apply_category_deltas(cursor, category_deltas)
                     logging.info("[DELETE] Product deleted: %s", product_id)
         except Exception as e:
             logging.error("[DELETE] Failed to delete Product %s: %s", product_id, e)
             raise
+        if deleted_categories:
+            self.record_catalog_changes(product_delta=-len(deleted_categories))
 
     def mark_product_processed(self, product_id: str) -> None:
         """No-op: api_product does not persist processed state."""
@@ -282,3 +786,56 @@ class ProductManager:
         except Exception as e:
             logging.error("[COUNT] Failed to count Products: %s", e)
             raise
+
+    def reconcile_catalog_metadata(self) -> int:
+        """
+        Reset `total_products` to an exact COUNT(*) to correct drift.
+
+        The catalog version is bumped only when the stored count changed.
+
+        Returns:
+            int: The exact product count.
+        """
+        try:
+            with self._connect() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM api_product")
+                    product_count = int(cursor.fetchone()[0])
+                    cursor.execute(
+                        """
+                        INSERT INTO api_catalogmetadata (key, value, updated_at)
+                        VALUES (%s, %s::jsonb, NOW())
+                        ON CONFLICT (key) DO UPDATE SET
+                            value = EXCLUDED.value,
+                            updated_at = NOW()
+                        WHERE api_catalogmetadata.value IS DISTINCT FROM EXCLUDED.value
+                        """,
+                        (CATALOG_TOTAL_PRODUCTS_KEY, json.dumps(product_count)),
+                    )
+                    if cursor.rowcount:
+                        self._record_catalog_write(cursor)
+                        logging.info("[UPDATE] Catalog product count reconciled to %s", product_count)
+                    return product_count
+        except Exception as e:
+            logging.error("[UPDATE] Failed to reconcile catalog metadata: %s", e)
+            raise
+
+    def reconcile_category_stats(self) -> int:
+        """
+        Rebuild every api_categorystats row from api_product to correct drift
+        from concurrent writers. The catalog version is bumped only if a row changed.
+
+        Returns:
+            int: Number of rows inserted, changed or removed.
+        """
+        try:
+            with self._connect() as connection:
+                with connection.cursor() as cursor:
+                    changed = self._refresh_category_stats(cursor)
+                    if changed:
+                        self._record_catalog_write(cursor)
+                        logging.info("[UPDATE] Category stats reconciled: %s rows changed", changed)
+                    return changed
+        except Exception as e:
+            logging.error("[UPDATE] Failed to reconcile category stats: %s", e)
+            raise
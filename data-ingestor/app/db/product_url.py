@@ -1,8 +1,12 @@
 import os
 import logging
+import time
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
 from app.models import ProductUrl
 from app.utils import get_db
+from app.db.stats import StatsManager
 load_dotenv()
 
 logging.basicConfig(
@@ -13,6 +17,17 @@ logging.basicConfig(
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("MONGO_DBNAME")
 PRODUCT_URLS_COLLECTION_NAME = os.getenv("PRODUCT_URLS_COLLECTION_NAME")
+SOURCES_COLLECTION_NAME = os.getenv("SOURCES_COLLECTION_NAME")
+
+# Re-scrape scheduling (see get_rescrape_candidates / record_scrape).
+VOLATILITY_SMOOTHING = float(os.getenv("RESCRAPE_VOLATILITY_SMOOTHING", "0.3"))
+INITIAL_VOLATILITY = 0.5
+DEFAULT_SCRAPE_INTERVAL_HOURS = float(os.getenv("RESCRAPE_DEFAULT_INTERVAL_HOURS", "24"))
+RESCRAPE_MAX_AGE_HOURS = float(os.getenv("RESCRAPE_MAX_AGE_HOURS", str(14 * 24)))
+RESCRAPE_MIN_STALENESS = float(os.getenv("RESCRAPE_MIN_STALENESS", "0.05"))
+RESCRAPE_IN_FLIGHT_HOURS = float(os.getenv("RESCRAPE_IN_FLIGHT_HOURS", "6"))
+# Seconds between attempts to build the unique url index while duplicates block it.
+URL_INDEX_RETRY_SECONDS = float(os.getenv("URL_INDEX_RETRY_SECONDS", "600"))
 
 class ProductUrlManager:
     """CRUD manager for Data Ingestor Product URLs"""
@@ -20,14 +35,57 @@ class ProductUrlManager:
     def __init__(self):
         self.db = get_db()
         self.collection = self.db[PRODUCT_URLS_COLLECTION_NAME]
+        self.stats = StatsManager()
+        self._url_index_ready = False
+        self._url_index_retry_at = 0.0
+
+    def _ensure_url_index(self) -> bool:
+        """
+        Create the unique index on `url` once per process.
+
+        The build fails while the collection still holds duplicate URLs; it is
+        then retried at most every URL_INDEX_RETRY_SECONDS rather than on every
+        insert.
 
-    def create_product_url(self, product_url: ProductUrl) -> None:
+        Returns:
+            bool: True once the index exists.
+        """
+        if self._url_index_ready or time.monotonic() < self._url_index_retry_at:
+            return self._url_index_ready
         try:
+            self.collection.create_index("url", unique=True, name="url_unique")
+            self._url_index_ready = True
+        except Exception as e:
+            self._url_index_retry_at = time.monotonic() + URL_INDEX_RETRY_SECONDS
+            logging.warning(
+                f"[INDEX] Could not create unique index on ProductUrl url, "
+                f"checking for existing URLs before inserts until it exists: {e}"
+            )
+        return self._url_index_ready
+
+    def create_product_url(self, product_url: ProductUrl) -> bool:
+        """
+        Insert a ProductUrl unless one with the same URL exists.
+
+        Returns:
+            bool: True if inserted, False if the URL was already stored.
+        """
+        try:
+            # Without the index nothing rejects a duplicate, so check first (racy, but
+            # no worse than before the index existed).
+            if not self._ensure_url_index() and self.product_url_exists(product_url.url):
+                logging.info(f"[CREATE] ProductUrl already exists for URL: {product_url.url}")
+                return False
             logging.info(f"[CREATE] Inserting ProductUrl: {product_url.id}")
             product_url_dict = product_url.model_dump(mode="json")
             product_url_dict["_id"] = product_url_dict["id"]
             self.collection.insert_one(product_url_dict)
+            self.stats.record_product_url(product_url.source_id, 1)
             logging.info(f"[CREATE] Successfully inserted ProductUrl: {product_url.id}")
+            return True
+        except DuplicateKeyError:
+            logging.info(f"[CREATE] ProductUrl already exists for URL: {product_url.url}")
+            return False
         except Exception as e:
             logging.error(f"[CREATE] Failed to insert ProductUrl {getattr(product_url, 'id', '')}: {e}")
             raise
@@ -91,8 +149,9 @@ class ProductUrlManager:
     def delete_product_url(self, product_url_id: str) -> None:
         try:
             logging.info(f"[DELETE] Deleting ProductUrl with ID: {product_url_id}")
-            result = self.collection.delete_one({"id": product_url_id})
-            if result.deleted_count == 1:
+            deleted = self.collection.find_one_and_delete({"id": product_url_id}, projection={"source_id": 1})
+            if deleted:
+                self.stats.record_product_url(deleted.get("source_id"), -1)
                 logging.info(f"[DELETE] Successfully deleted ProductUrl: {product_url_id}")
             else:
                 logging.warning(f"[DELETE] ProductUrl not found for deletion: {product_url_id}")
@@ -160,3 +219,178 @@ class ProductUrlManager:
         except Exception as e:
             logging.error(f"[READ] Failed to fetch ProductUrl ID for URL {url}: {e}")
             raise
+
+    def count_by_source(self) -> list[dict]:
+        """
+        Count ProductUrls per source with a server-side $group and resolve
+        source names with a $lookup into the sources collection.
+
+        Returns:
+            list[dict]: Items shaped as {"source_id", "name", "count"}, largest first.
+                `name` falls back to the source ID when the source no longer exists.
+        """
+        try:
+            logging.info("[READ] Aggregating ProductUrl counts by source")
+            pipeline = [
+                {"$group": {"_id": "$source_id", "count": {"$sum": 1}}},
+                {"$lookup": {
+                    "from": SOURCES_COLLECTION_NAME,
+                    "localField": "_id",
+                    "foreignField": "id",
+                    "as": "source",
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "source_id": "$_id",
+                    "count": 1,
+                    "name": {"$ifNull": [{"$arrayElemAt": ["$source.name", 0]}, "$_id"]},
+                }},
+                {"$sort": {"count": -1}},
+            ]
+            results = list(self.collection.aggregate(pipeline))
+            logging.info(f"[READ] ProductUrl counts aggregated for {len(results)} sources")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to aggregate ProductUrl counts by source: {e}")
+            raise
+
+    def get_product_urls_page(self, page: int = 1, page_size: int = 50) -> list:
+        """
+        Fetch one page of ProductUrls, newest first.
+
+        Args:
+            page (int): 1-based page number.
+            page_size (int): Number of records per page.
+
+        Returns:
+            list: ProductUrl documents for the requested page.
+        """
+        try:
+            logging.info(f"[READ] Fetching ProductUrl page {page} (page_size={page_size})")
+            results = list(
+                self.collection.find()
+                .sort("$natural", -1)
+                .skip((max(page, 1) - 1) * page_size)
+                .limit(page_size)
+            )
+            logging.info(f"[READ] ProductUrls fetched for page {page}: {len(results)}")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to fetch ProductUrl page {page}: {e}")
+            raise
+
+    def get_rescrape_candidates(self, budget: int) -> list[dict]:
+        """
+        Pick up to `budget` ProductUrls to scrape, most likely stale first.
+
+        A product that changes at `change_rate` per hour and was last scraped
+        `t` hours ago has changed since with probability 1 - exp(-rate * t);
+        that expected staleness is the priority. Never-scraped URLs come first,
+        then URLs older than RESCRAPE_MAX_AGE_HOURS, then the rest by staleness.
+        URLs below RESCRAPE_MIN_STALENESS or with a scrape still in flight are
+        skipped, so stable products cost little browser time.
+
+        Args:
+            budget (int): Maximum number of URLs to return.
+
+        Returns:
+            list[dict]: Items shaped as {"id", "url", "batch_id", "priority"}, highest priority first.
+        """
+        if budget <= 0:
+            return []
+        try:
+            now = datetime.now(timezone.utc)
+            hours_since_scrape = {"$divide": [{"$subtract": [now, "$last_scraped"]}, 3600 * 1000]}
+            default_rate = INITIAL_VOLATILITY / DEFAULT_SCRAPE_INTERVAL_HOURS
+            pipeline = [
+                {"$match": {"$or": [
+                    {"scrape_requested_at": None},
+                    {"scrape_requested_at": {"$lt": now - timedelta(hours=RESCRAPE_IN_FLIGHT_HOURS)}},
+                    {"$expr": {"$gte": ["$last_scraped", "$scrape_requested_at"]}},
+                ]}},
+                {"$project": {
+                    "_id": 0,
+                    "id": 1,
+                    "url": 1,
+                    "batch_id": 1,
+                    "priority": {"$switch": {
+                        "branches": [
+                            {"case": {"$eq": [{"$ifNull": ["$last_scraped", None]}, None]}, "then": 2.0},
+                            {"case": {"$gte": [hours_since_scrape, RESCRAPE_MAX_AGE_HOURS]}, "then": 1.5},
+                        ],
+                        "default": {"$subtract": [1, {"$exp": {"$multiply": [
+                            -1,
+                            {"$ifNull": ["$change_rate", default_rate]},
+                            hours_since_scrape,
+                        ]}}]},
+                    }},
+                }},
+                {"$match": {"priority": {"$gte": RESCRAPE_MIN_STALENESS}}},
+                {"$sort": {"priority": -1}},
+                {"$limit": budget},
+            ]
+            results = list(self.collection.aggregate(pipeline))
+            logging.info(f"[READ] Selected {len(results)} ProductUrls for re-scrape (budget {budget})")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to select ProductUrls for re-scrape: {e}")
+            raise
+
+    def mark_scrape_requested(self, product_url_ids: list[str]) -> None:
+        """Stamp dispatched ProductUrls so they are not picked again while their scrape is in flight."""
+        if not product_url_ids:
+            return
+        try:
+            self.collection.update_many(
+                {"id": {"$in": product_url_ids}},
+                {"$set": {"scrape_requested_at": datetime.now(timezone.utc)}},
+            )
+        except Exception as e:
+            logging.error(f"[UPDATE] Failed to mark ProductUrls as requested: {e}")
+            raise
+
+    def record_scrape(self, product_url_id: str, changed: bool) -> None:
+        """
+        Update a ProductUrl's change tracking after a successful scrape.
+
+        `volatility` is an exponentially weighted share of scrapes that found a
+        change, `scrape_interval_hours` the weighted time between scrapes, and
+        `change_rate` (changes per hour) their ratio. The first scrape only sets
+        the baseline, since storing a new product is not a change.
+        """
+        try:
+            doc = self.collection.find_one(
+                {"id": product_url_id},
+                {"last_scraped": 1, "volatility": 1, "scrape_interval_hours": 1},
+            )
+            if doc is None:
+                logging.warning(f"[UPDATE] ProductUrl not found for scrape tracking: {product_url_id}")
+                return
+
+            now = datetime.now(timezone.utc)
+            changes = {"last_scraped": now}
+            last_scraped = doc.get("last_scraped")
+            if last_scraped is None:
+                changes["volatility"] = INITIAL_VOLATILITY
+                changes["last_changed"] = now
+            else:
+                if last_scraped.tzinfo is None:
+                    last_scraped = last_scraped.replace(tzinfo=timezone.utc)
+                elapsed_hours = max((now - last_scraped).total_seconds() / 3600, 1 / 60)
+                previous_volatility = doc.get("volatility")
+                if previous_volatility is None:
+                    previous_volatility = INITIAL_VOLATILITY
+                previous_interval = doc.get("scrape_interval_hours") or elapsed_hours
+                alpha = VOLATILITY_SMOOTHING
+                volatility = alpha * (1.0 if changed else 0.0) + (1 - alpha) * previous_volatility
+                interval = alpha * elapsed_hours + (1 - alpha) * previous_interval
+                changes["volatility"] = volatility
+                changes["scrape_interval_hours"] = interval
+                changes["change_rate"] = volatility / interval
+                if changed:
+                    changes["last_changed"] = now
+
+            self.collection.update_one({"id": product_url_id}, {"$set": changes})
+        except Exception as e:
+            logging.error(f"[UPDATE] Failed to record scrape for ProductUrl {product_url_id}: {e}")
+            raise
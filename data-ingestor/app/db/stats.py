@@ -0,0 +1,123 @@
+import os
+import logging
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from app.utils import get_db
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DBNAME")
+STATS_COLLECTION_NAME = os.getenv("STATS_COLLECTION_NAME", "data_ingestor_stats")
+
+STATUS_STATS_ID = "status"
+PRODUCT_URL_STATS_ID = "product_urls_by_source"
+BATCH_STATS_ID = "batches"
+PRODUCTS_PER_DAY_STATS_ID = "products_per_day"
+
+
+class StatsManager:
+    """
+    Materialized ingestion counters for the dashboard.
+
+    Write paths in the other managers bump these documents with $inc so reads
+    are a single find. Counter updates are best-effort: failures are logged
+    and any drift is corrected by `reconcile()`.
+
+    Documents:
+    - "status": {"counts": {<status>: int}}
+    - "product_urls_by_source": {"counts": {<source_id>: int}}
+    - "batches": {"count": int, "batched_urls": int}
+    - "products_per_day": {"counts": {"YYYY-MM-DD": int}}
+    """
+
+    def __init__(self):
+        self.db = get_db()
+        self.collection = self.db[STATS_COLLECTION_NAME]
+
+    def _inc(self, stats_id: str, deltas: dict) -> None:
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        try:
+            self.collection.update_one({"_id": stats_id}, {"$inc": deltas}, upsert=True)
+        except Exception as e:
+            logging.warning(f"[STATS] Failed to update '{stats_id}' counters {deltas}: {e}")
+
+    def record_status_change(
+        self,
+        old_status: str | None,
+        new_status: str | None,
+        ingestion_type: str | None = None,
+    ) -> None:
+        """Move one Status record between state counters."""
+        if old_status == new_status:
+            return
+        deltas = {}
+        if old_status:
+            deltas[f"counts.{old_status}"] = -1
+        if new_status:
+            deltas[f"counts.{new_status}"] = 1
+        self._inc(STATUS_STATS_ID, deltas)
+
+        if new_status == "completed" and ingestion_type == "product":
+            today = datetime.now(timezone.utc).date().isoformat()
+            self._inc(PRODUCTS_PER_DAY_STATS_ID, {f"counts.{today}": 1})
+
+    def record_product_url(self, source_id: str, delta: int = 1) -> None:
+        """Adjust the ProductUrl counter for a source."""
+        self._inc(PRODUCT_URL_STATS_ID, {f"counts.{source_id}": delta})
+
+    def record_batch(self, count_delta: int = 0, urls_delta: int = 0) -> None:
+        """Adjust the batch count and the number of URLs held in batches."""
+        self._inc(BATCH_STATS_ID, {"count": count_delta, "batched_urls": urls_delta})
+
+    def get_stats(self) -> dict:
+        """
+        Fetch every counter document in one query.
+
+        Returns:
+            dict: Counter documents keyed by their _id. Empty if never reconciled or written.
+        """
+        try:
+            logging.info("[READ] Fetching ingestion stats")
+            return {doc.pop("_id"): doc for doc in self.collection.find()}
+        except Exception as e:
+            logging.error(f"[READ] Failed to fetch ingestion stats: {e}")
+            raise
+
+    def reconcile(
+        self,
+        status_counts: dict[str, int],
+        product_url_counts: dict[str, int],
+        batch_count: int,
+        batched_urls: int,
+    ) -> None:
+        """
+        Overwrite the running counters with freshly aggregated values.
+
+        `products_per_day` cannot be rebuilt from the Status collection and is left untouched.
+        """
+        try:
+            logging.info("[UPDATE] Reconciling ingestion stats")
+            reconciled_at = datetime.now(timezone.utc)
+            replacements = {
+                STATUS_STATS_ID: {"counts": status_counts},
+                PRODUCT_URL_STATS_ID: {"counts": product_url_counts},
+                BATCH_STATS_ID: {"count": batch_count, "batched_urls": batched_urls},
+            }
+            for stats_id, values in replacements.items():
+                self.collection.replace_one(
+                    {"_id": stats_id},
+                    {**values, "reconciled_at": reconciled_at},
+                    upsert=True,
+                )
+            logging.info("[UPDATE] Ingestion stats reconciled")
+        except Exception as e:
+            logging.error(f"[UPDATE] Failed to reconcile ingestion stats: {e}")
+            raise
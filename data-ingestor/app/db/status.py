@@ -3,6 +3,7 @@ import logging
 from dotenv import load_dotenv
 from app.models import Status
 from app.utils import get_db
+from app.db.stats import StatsManager
 
 
 load_dotenv()
@@ -22,6 +23,7 @@ class StatusManager:
     def __init__(self):
         self.db = get_db()
         self.collection = self.db[STATUS_COLLECTION_NAME]
+        self.stats = StatsManager()
 
     def create_status(self, status: Status) -> None:
         try:
@@ -29,6 +31,7 @@ class StatusManager:
             status_dict = status.model_dump(mode="json")
             status_dict["_id"] = status_dict["id"]
             self.collection.insert_one(status_dict)
+            self.stats.record_status_change(None, status.status, status.ingestion_type)
             logging.info(f"[CREATE] Successfully inserted Status: {status.id}")
         except Exception as e:
             logging.error(f"[CREATE] Failed to insert Status {getattr(status, 'id', '')}: {e}")
@@ -38,8 +41,20 @@ class StatusManager:
     def update_status(self, status_id: str, changes: dict) -> None:
         try:
             logging.info(f"[UPDATE] Updating Status with ID: {status_id}")
-            result = self.collection.update_one({"id": status_id}, {"$set": changes})
-            if result.matched_count == 1:
+            if "status" in changes:
+                previous = self.collection.find_one_and_update(
+                    {"id": status_id},
+                    {"$set": changes},
+                    projection={"status": 1, "ingestion_type": 1},
+                )
+                matched = previous is not None
+                if matched:
+                    self.stats.record_status_change(
+                        previous.get("status"), changes["status"], previous.get("ingestion_type")
+                    )
+            else:
+                matched = self.collection.update_one({"id": status_id}, {"$set": changes}).matched_count == 1
+            if matched:
                 logging.info(f"[UPDATE] Successfully updated Status: {status_id}")
             else:
                 logging.warning(f"[UPDATE] Status not found for update: {status_id}")
@@ -73,8 +88,9 @@ class StatusManager:
     def delete_status(self, status_id: str) -> None:
         try:
             logging.info(f"[DELETE] Deleting Status with ID: {status_id}")
-            result = self.collection.delete_one({"id": status_id})
-            if result.deleted_count == 1:
+            deleted = self.collection.find_one_and_delete({"id": status_id}, projection={"status": 1})
+            if deleted:
+                self.stats.record_status_change(deleted.get("status"), None)
                 logging.info(f"[DELETE] Successfully deleted Status: {status_id}")
             else:
                 logging.warning(f"[DELETE] Status not found for deletion: {status_id}")
@@ -116,3 +132,44 @@ class StatusManager:
             logging.error(f"[READ] Failed to fetch status value for Status ID '{status_id}': {e}")
             raise
 
+    def count_by_status(self) -> dict[str, int]:
+        """
+        Count Status records per status value with a server-side $group.
+
+        Returns:
+            dict[str, int]: Mapping of status value to number of records.
+        """
+        try:
+            logging.info("[READ] Aggregating Status counts by status")
+            pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            results = {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
+            logging.info(f"[READ] Status counts aggregated: {results}")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to aggregate Status counts: {e}")
+            raise
+
+    def get_status_page(self, page: int = 1, page_size: int = 50) -> list:
+        """
+        Fetch one page of Status records, newest first.
+
+        Args:
+            page (int): 1-based page number.
+            page_size (int): Number of records per page.
+
+        Returns:
+            list: Status documents for the requested page.
+        """
+        try:
+            logging.info(f"[READ] Fetching Status page {page} (page_size={page_size})")
+            results = list(
+                self.collection.find()
+                .sort("$natural", -1)
+                .skip((max(page, 1) - 1) * page_size)
+                .limit(page_size)
+            )
+            logging.info(f"[READ] Status records fetched for page {page}: {len(results)}")
+            return results
+        except Exception as e:
+            logging.error(f"[READ] Failed to fetch Status page {page}: {e}")
+            raise
@@ -16,6 +16,8 @@ class Listing(BaseModel):
             Example: 2025-06-01 15:20:50.410901+00:00
         url (str): URL of the listing.
         active (StrictBool): Whether the listing is currently active. Defaults to False.
+        scrape_requested_at (Optional[datetime]): When the scheduler last dispatched a scrape
+            for this listing; blocks re-dispatch while the job is in flight.
     """
 
     id: str = Field(..., description="Unique identifier for the listing.")
@@ -29,3 +31,7 @@ class Listing(BaseModel):
         default=False,
         description="Indicates whether the listing is currently active."
     )
+    scrape_requested_at: Optional[datetime] = Field(
+        default=None,
+        description="Datetime when a scrape of the listing was last dispatched."
+    )
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, StrictBool
 from typing import Optional
+from datetime import datetime
 
 class ProductUrl(BaseModel):
     """
@@ -19,6 +20,18 @@ class ProductUrl(BaseModel):
         Example: True
     - batch_id (Optional[str]): Identifier of the batch to which this product URL belongs, if any.  
         Example: "batch_789"
+    - last_scraped (Optional[datetime]): When the product page was last scraped successfully.  
+        Example: 2025-06-01 15:20:50.410901+00:00
+    - last_changed (Optional[datetime]): When a scrape last found different product content.  
+        Example: 2025-05-28 09:00:00+00:00
+    - scrape_requested_at (Optional[datetime]): When the latest scrape job was dispatched.  
+        Example: 2025-06-01 15:00:00+00:00
+    - volatility (Optional[float]): Weighted share of recent scrapes that found a change (0-1).  
+        Example: 0.42
+    - scrape_interval_hours (Optional[float]): Weighted hours between recent scrapes.  
+        Example: 12.5
+    - change_rate (Optional[float]): Estimated content changes per hour (volatility / interval).  
+        Example: 0.034
     """
 
     id: str = Field(..., description="Unique identifier for the product URL.")
@@ -27,4 +40,10 @@ class ProductUrl(BaseModel):
     listing_id: str = Field(..., description="Identifier of the listing associated with this product URL.")
     page_index: int = Field(..., description="Index of the page from which the product URL was scraped.")
     batched: StrictBool = Field(default=False, description="Indicates whether the product URL has been added to a batch (default: False).")
-    batch_id: Optional[str] = Field(default=None, description="Identifier of the batch to which this product URL belongs, if any.")
\ No newline at end of file
+    batch_id: Optional[str] = Field(default=None, description="Identifier of the batch to which this product URL belongs, if any.")
+    last_scraped: Optional[datetime] = Field(default=None, description="When the product page was last scraped successfully.")
+    last_changed: Optional[datetime] = Field(default=None, description="When a scrape last found different product content.")
+    scrape_requested_at: Optional[datetime] = Field(default=None, description="When the latest scrape job was dispatched.")
+    volatility: Optional[float] = Field(default=None, description="Weighted share of recent scrapes that found a change (0-1).")
+    scrape_interval_hours: Optional[float] = Field(default=None, description="Weighted hours between recent scrapes.")
+    change_rate: Optional[float] = Field(default=None, description="Estimated content changes per hour (volatility / interval).")
@@ -11,5 +11,6 @@ def api_index():
         "endpoints": {
             "GET /api/sources": "Fetch all sources",
             "GET /api/listings": "Fetch all listings",
+            "GET /api/dashboard/summary": "Fetch dashboard counters and chart data",
         },
     }
@@ -1,12 +1,14 @@
 import os
 from fastapi import APIRouter, Request, Form, status as http_status
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse
 from starlette.templating import Jinja2Templates
 from dotenv import load_dotenv
-from app.db import SourceManager, ListingsManager, StatusManager, ProductUrlManager, BatchManager, ProductManager
-from collections import Counter
+from app.db import SourceManager, ListingsManager, StatusManager, ProductUrlManager, BatchManager, ProductManager, StatsManager
+from app.db.stats import STATUS_STATS_ID, PRODUCT_URL_STATS_ID, BATCH_STATS_ID, PRODUCTS_PER_DAY_STATS_ID
 from app.models import Source
-from datetime import datetime
+from datetime import datetime, timezone
+from math import ceil
+from urllib.parse import urlencode
 from uuid import uuid4
 
 source_manager = SourceManager()
@@ -15,72 +17,141 @@ status_manager = StatusManager()
 product_url_mangaer = ProductUrlManager()
 batch_manager = BatchManager()
 product_manager = ProductManager()
+stats_manager = StatsManager()
 
 load_dotenv()
 
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+MAXIMUM_BATCH_SIZE = int(os.getenv("MAXIMUM_BATCH_SIZE", "100"))
+PRODUCTS_PER_DAY_WINDOW = 14
 
 router = APIRouter()
 
 templates = Jinja2Templates(directory="./app/templates")
 
 
+def _dashboard_summary(sources: list[dict]) -> dict:
+    """
+    Chart and counter data for the dashboard.
+
+    Reads the materialized counters kept by StatsManager (a single find), and
+    falls back to server-side aggregations until the counters have been
+    reconciled for the first time. Counter documents created by $inc before
+    that only hold post-deploy deltas, so they are not trusted on their own.
+    """
+    stats = stats_manager.get_stats()
+    if all(stats.get(stats_id, {}).get("reconciled_at") for stats_id in (STATUS_STATS_ID, PRODUCT_URL_STATS_ID, BATCH_STATS_ID)):
+        status_counts = stats[STATUS_STATS_ID].get("counts", {})
+        source_counts = stats[PRODUCT_URL_STATS_ID].get("counts", {})
+        batch_totals = stats[BATCH_STATS_ID]
+    else:
+        status_counts = status_manager.count_by_status()
+        source_counts = {item["source_id"]: item["count"] for item in product_url_mangaer.count_by_source()}
+        batch_totals = batch_manager.get_batch_totals()
+
+    status_bar_chart_data = {
+        "labels": ["Completed", "Processing", "Failed"],
+        "values": [
+            status_counts.get("completed", 0),
+            status_counts.get("processing", 0),
+            status_counts.get("failed", 0),
+        ],
+    }
+    source_names = {source["id"]: source.get("name") for source in sources}
+    source_counts = sorted(
+        ((source_id, count) for source_id, count in source_counts.items() if count > 0),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    source_pie_chart_data = {
+        "labels": [source_names.get(source_id) or source_id for source_id, _ in source_counts],
+        "values": [count for _, count in source_counts],
+    }
+
+    batch_count = batch_totals.get("count", 0)
+    batched_urls = batch_totals.get("batched_urls", 0)
+    batch_capacity = batch_count * MAXIMUM_BATCH_SIZE
+    products_per_day = stats.get(PRODUCTS_PER_DAY_STATS_ID, {}).get("counts", {})
+    today = datetime.now(timezone.utc).date().isoformat()
+
+    return {
+        "products_count": product_manager.get_products_count(),
+        "products_ingested_today": products_per_day.get(today, 0),
+        "products_per_day": dict(sorted(products_per_day.items())[-PRODUCTS_PER_DAY_WINDOW:]),
+        "status_total": sum(status_counts.values()),
+        "product_url_total": sum(count for _, count in source_counts),
+        "batch_total": batch_count,
+        "batch_fill_percent": round(100 * batched_urls / batch_capacity) if batch_capacity else 0,
+        "status_bar_chart_data": status_bar_chart_data,
+        "source_pie_chart_data": source_pie_chart_data,
+    }
+
+
+def _pagination(request: Request, param: str, page: int, total: int) -> dict:
+    pages = max(ceil(total / DASHBOARD_PAGE_SIZE), 1)
+    page = min(max(page, 1), pages)
+
+    def page_url(target: int) -> str:
+        return "?" + urlencode({**request.query_params, param: target})
+
+    return {
+        "page": page,
+        "pages": pages,
+        "prev_url": page_url(page - 1) if page > 1 else None,
+        "next_url": page_url(page + 1) if page < pages else None,
+    }
+
+
 @router.get("/dashboard", response_class=HTMLResponse)
-def home(request: Request):
+def home(request: Request, status_page: int = 1, product_url_page: int = 1, batch_page: int = 1):
     """
     Home route (Dashboard page).
 
     - If a user is logged in (session contains 'user' key),
       render the dashboard with the username.
     - Otherwise, redirect to the login page.
+    - Status, product URL and batch tables are paginated with the
+      `status_page`, `product_url_page` and `batch_page` query params.
     """
     username = request.session.get("user")
     if username:
         sources = source_manager.get_sources()
-        listings = listings_mangaer.get_all_listings()
-        statuses = status_manager.get_all_status()
-        product_urls = product_url_mangaer.get_all_product_urls()
-        batches = batch_manager.get_all_batches()
-        status_bar_graph_data_dict = {
-            "Completed": 0,
-            "Processing": 0,
-            "Failed": 0
-        }
-        products_count = product_manager.get_products_count()
-        for status_doc in statuses:
-            if status_doc['status'] == 'completed':
-                status_bar_graph_data_dict['Completed'] += 1
-            elif status_doc['status'] == 'processing':
-                status_bar_graph_data_dict['Processing'] += 1
-            elif status_doc['status'] == 'failed':
-                status_bar_graph_data_dict['Failed'] += 1
-        status_bar_chart_data = {
-            "labels": list(status_bar_graph_data_dict.keys()),
-            "values": list(status_bar_graph_data_dict.values())
-        }
-        source_distribution = Counter(p["source_id"] for p in product_urls)
-        source_distribution_named = {}
-        for source_id, count in source_distribution.items():
-            source_name = source_manager.get_source_name(source_id) or source_id
-            source_distribution_named[source_name] = count
-        source_pie_chart_data = {
-            "labels": list(source_distribution_named.keys()),
-            "values": list(source_distribution_named.values()),
-        }
+        summary = _dashboard_summary(sources)
+        status_pagination = _pagination(request, "status_page", status_page, summary["status_total"])
+        product_url_pagination = _pagination(
+            request, "product_url_page", product_url_page, summary["product_url_total"]
+        )
+        batch_pagination = _pagination(request, "batch_page", batch_page, summary["batch_total"])
         return templates.TemplateResponse(
             "dashboard.html",
             {
                 "request": request,
                 "username": username,
                 "sources": sources,
-                "listings": listings,
-                "statuses": statuses,
-                "product_urls": product_urls,
-                "status_bar_chart_data": status_bar_chart_data,
-                "source_pie_chart_data": source_pie_chart_data,
-                "batches": batches,
-                "products_count": products_count
+                "listings": listings_mangaer.get_all_listings(),
+                "statuses": status_manager.get_status_page(status_pagination["page"], DASHBOARD_PAGE_SIZE),
+                "product_urls": product_url_mangaer.get_product_urls_page(
+                    product_url_pagination["page"], DASHBOARD_PAGE_SIZE
+                ),
+                "batches": batch_manager.get_batches_page(batch_pagination["page"], DASHBOARD_PAGE_SIZE),
+                "status_pagination": status_pagination,
+                "product_url_pagination": product_url_pagination,
+                "batch_pagination": batch_pagination,
+                **summary,
             }
         )
     return RedirectResponse("/login", status_code=http_status.HTTP_302_FOUND)
+
+
+@router.get("/api/dashboard/summary")
+def dashboard_summary(request: Request):
+    """
+    GET /api/dashboard/summary - Dashboard counters and chart data as JSON.
+
+    - Requires a logged-in session.
+    """
+    if not request.session.get("user"):
+        return JSONResponse({"detail": "Not authenticated"}, status_code=http_status.HTTP_401_UNAUTHORIZED)
+    return _dashboard_summary(source_manager.get_sources())
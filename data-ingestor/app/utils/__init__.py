@@ -1,7 +1,10 @@
 import os
 import certifi
+import requests
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.models import Batch
 
 load_dotenv()
@@ -9,8 +12,12 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("MONGO_DBNAME")
 
+HTTP_POOL_SIZE = int(os.getenv("SCRAPING_AGENT_CONCURRENCY", "8"))
+HTTP_MAX_RETRIES = int(os.getenv("SCRAPING_AGENT_MAX_RETRIES", "3"))
+
 _client = None
 _db = None
+_http_session = None
 
 def get_client() -> MongoClient:
     global _client
@@ -28,3 +35,31 @@ def get_db():
     if _db is None:
         _db = get_client()[DB_NAME]
     return _db
+
+def get_http_session() -> requests.Session:
+    """
+    Shared keep-alive HTTP session for Scraping Agent calls.
+
+    Connections are pooled per host. Connection errors are retried for every
+    method; read errors and 502/503/504 responses are retried only for GETs so
+    that job-creating POSTs are never sent twice.
+    """
+    global _http_session
+    if _http_session is None:
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_session = session
+    return _http_session
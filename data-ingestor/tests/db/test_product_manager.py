@@ -0,0 +1,71 @@
+import pytest
+
+from app.db.product import CATEGORY_HISTOGRAM_BUCKETS, ProductManager
+
+
+PAYLOAD = {
+    "title": "Linen Shirt",
+    "price": 1499.0,
+    "url": "https://example.com/products/linen-shirt",
+    "image_url": "https://example.com/images/linen-shirt.jpg",
+    "category": "Shirts",
+}
+
+
+@pytest.mark.unit
+def test_content_hash_is_stable_for_equal_content():
+    assert ProductManager._content_hash(PAYLOAD) == ProductManager._content_hash(dict(PAYLOAD))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("title", "Linen Shirt "),
+        ("price", 1399.0),
+        ("image_url", "https://example.com/images/linen-shirt-2.jpg"),
+        ("category", "Tops"),
+    ],
+)
+def test_content_hash_changes_with_each_stored_field(field, value):
+    assert ProductManager._content_hash({**PAYLOAD, field: value}) != ProductManager._content_hash(PAYLOAD)
+
+
+@pytest.mark.unit
+def test_content_hash_ignores_the_url():
+    # The URL is the upsert key, not content.
+    changed = {**PAYLOAD, "url": "https://example.com/products/other"}
+
+    assert ProductManager._content_hash(changed) == ProductManager._content_hash(PAYLOAD)
+
+
+@pytest.mark.unit
+def test_price_histogram_splits_range_into_equal_buckets():
+    histogram = ProductManager._price_histogram(100.0, 200.0, {1: 3, 4: 1, CATEGORY_HISTOGRAM_BUCKETS: 2})
+
+    assert len(histogram) == CATEGORY_HISTOGRAM_BUCKETS
+    assert histogram[0] == {"min": 100.0, "max": 110.0, "count": 3}
+    assert histogram[3]["count"] == 1
+    assert histogram[-1]["max"] == 200.0
+    assert histogram[-1]["count"] == 2
+    assert sum(bucket["count"] for bucket in histogram) == 6
+    assert all(left["max"] == right["min"] for left, right in zip(histogram, histogram[1:]))
+
+
+@pytest.mark.unit
+def test_price_histogram_uses_one_bucket_when_all_prices_are_equal():
+    assert ProductManager._price_histogram(499.0, 499.0, {1: 5}) == [{"min": 499.0, "max": 499.0, "count": 5}]
+
+
+@pytest.mark.unit
+def test_category_deltas_accumulate_counts_and_bounds():
+    deltas = {}
+    ProductManager._add_category_delta(deltas, "shirts", count=1, price=20.0)
+    ProductManager._add_category_delta(deltas, "shirts", count=1, price=5.0)
+    ProductManager._add_category_delta(deltas, "shirts", price=12.0)
+    ProductManager._add_category_delta(deltas, "tops", count=-1)
+
+    assert deltas == {
+        "shirts": {"count": 2, "min": 5.0, "max": 20.0},
+        "tops": {"count": -1, "min": None, "max": None},
+    }
@@ -24,6 +24,7 @@ class JobsManager:
         client = MongoClient(MONGO_URI)
         db = client[DB_NAME]
         self.collection = db[JOBS_COLLECTION_NAME]
+        self._completed_at_indexed = False
 
     def create_job(self, job: Job):
         try:
@@ -61,3 +62,18 @@ class JobsManager:
         except Exception as e:
             logging.error(f"Failed to delete Job {job_id}: {e}")
             raise
+
+    def count_finished_since(self, since) -> dict:
+        """Count jobs finished at or after `since`, keyed by final status."""
+        try:
+            if not self._completed_at_indexed:
+                self.collection.create_index("completed_at")
+                self._completed_at_indexed = True
+            pipeline = [
+                {"$match": {"completed_at": {"$gte": since}}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+            ]
+            return {row["_id"]: row["count"] for row in self.collection.aggregate(pipeline)}
+        except Exception as e:
+            logging.error(f"Failed to count Jobs finished since {since}: {e}")
+            raise
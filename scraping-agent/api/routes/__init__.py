@@ -1,5 +1,6 @@
 from .scrape import router as ScrapeRouter
 from .status import router as StatusRouter
 from .base import router as IndexRouter
+from .capacity import router as CapacityRouter
 
-__all__ = ["ScrapeRouter","StatusRouter","IndexRouter"]
\ No newline at end of file
+__all__ = ["ScrapeRouter","StatusRouter","IndexRouter","CapacityRouter"]
\ No newline at end of file
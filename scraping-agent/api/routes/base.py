@@ -17,5 +17,6 @@ def api_index():
             r"POST /api/scrape/": "Start a new scraping task",
             r"GET /api/scrape/{task_id}/status/": "Check the status of a scraping task",
             r"GET /api/scraper/{task_id}/result/": "Fetch the result of a scraping task",
+            r"GET /api/scrapingagent/capacity/": "Queue depth, workers and recent throughput",
         },
     }
@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import redis
+from fastapi import APIRouter, HTTPException, Depends, status
+from api.celery_worker import celery_app, connection_link
+from api.db import JobsManager
+from api.security import verify_token
+
+
+router = APIRouter(prefix="/api/scrapingagent/capacity",redirect_slashes=False)
+job_manager = JobsManager()
+redis_client = redis.Redis.from_url(connection_link, socket_timeout=5)
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = "scraping_agent_scrape_"
+PRIORITIES = ("high", "medium", "low")
+# Snapshots are reused this long so frequent polling does not re-broadcast to workers.
+CAPACITY_CACHE_SECONDS = float(os.getenv("CAPACITY_CACHE_SECONDS", "10"))
+CAPACITY_INSPECT_TIMEOUT = float(os.getenv("CAPACITY_INSPECT_TIMEOUT", "1"))
+THROUGHPUT_WINDOW_SECONDS = int(os.getenv("THROUGHPUT_WINDOW_SECONDS", "900"))
+
+_cache = {"snapshot": None, "expires_at": 0.0}
+_cache_lock = threading.Lock()
+
+
+def _queue_depths() -> dict:
+    """Messages waiting in each priority queue (Celery's Redis transport keeps one list per queue)."""
+    with redis_client.pipeline(transaction=False) as pipe:
+        for priority in PRIORITIES:
+            pipe.llen(QUEUE_PREFIX + priority)
+        return dict(zip(PRIORITIES, pipe.execute()))
+
+
+def _worker_activity():
+    """Return (workers replying, tasks they are running), or (None, None) if the broadcast fails."""
+    try:
+        active = celery_app.control.inspect(timeout=CAPACITY_INSPECT_TIMEOUT).active() or {}
+    except Exception:
+        logger.warning("Failed to inspect Celery workers", exc_info=True)
+        return None, None
+    return len(active), sum(len(tasks or []) for tasks in active.values())
+
+
+def _throughput():
+    """Jobs finished in the last THROUGHPUT_WINDOW_SECONDS, or None if Mongo is unavailable."""
+    # completed_at is written with naive datetime.now(), so compare against the same clock.
+    since = datetime.now() - timedelta(seconds=THROUGHPUT_WINDOW_SECONDS)
+    try:
+        counts = job_manager.count_finished_since(since)
+    except Exception:
+        logger.warning("Failed to count finished jobs", exc_info=True)
+        return None
+    finished = sum(counts.values())
+    return {
+        "window_seconds": THROUGHPUT_WINDOW_SECONDS,
+        "completed": counts.get("completed", 0),
+        "failed": counts.get("failed", 0),
+        "per_minute": round(finished * 60 / THROUGHPUT_WINDOW_SECONDS, 2),
+    }
+
+
+def _build_snapshot() -> dict:
+    try:
+        queues = _queue_depths()
+    except redis.RedisError as exc:
+        logger.exception("Failed to read queue depths")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Failed to read queue depths",
+        ) from exc
+
+    workers, active_tasks = _worker_activity()
+    return {
+        "queues": queues,
+        "queued": sum(queues.values()),
+        "workers": workers,
+        "active_tasks": active_tasks,
+        "throughput": _throughput(),
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+@router.get("/", dependencies=[Depends(verify_token)])
+def get_capacity():
+    """
+    Report how loaded the agent is so producers can throttle themselves:
+    per-priority queue depth, live workers and their running tasks, and recent throughput.
+    `workers`/`active_tasks` and `throughput` are null when that part could not be read.
+    """
+    with _cache_lock:
+        if _cache["snapshot"] is not None and time.monotonic() < _cache["expires_at"]:
+            return _cache["snapshot"]
+        snapshot = _build_snapshot()
+        _cache["snapshot"] = snapshot
+        _cache["expires_at"] = time.monotonic() + CAPACITY_CACHE_SECONDS
+        return snapshot
@@ -1,9 +1,10 @@
 # app/main.py
 from fastapi import FastAPI
-from api.routes import ScrapeRouter, StatusRouter, IndexRouter
+from api.routes import ScrapeRouter, StatusRouter, IndexRouter, CapacityRouter
 
 app = FastAPI(title="ScrapingAgent API")
 
 app.include_router(IndexRouter)
 app.include_router(ScrapeRouter)
 app.include_router(StatusRouter)
+app.include_router(CapacityRouter)
@@ -0,0 +1,156 @@
+import pytest
+import redis
+from fastapi import HTTPException
+
+import api.routes.capacity as capacity_route
+
+
+class FakePipeline:
+    def __init__(self, depths, exc=None):
+        self.depths = depths
+        self.exc = exc
+        self.queues = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def llen(self, queue):
+        self.queues.append(queue)
+
+    def execute(self):
+        if self.exc:
+            raise self.exc
+        return [self.depths[queue] for queue in self.queues]
+
+
+class FakeRedis:
+    def __init__(self, depths=None, exc=None):
+        self.depths = depths or {}
+        self.exc = exc
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.depths, self.exc)
+
+
+class FakeInspect:
+    def __init__(self, active=None, exc=None):
+        self._active = active
+        self.exc = exc
+
+    def active(self):
+        if self.exc:
+            raise self.exc
+        return self._active
+
+
+class FakeControl:
+    def __init__(self, inspector):
+        self.inspector = inspector
+
+    def inspect(self, timeout):
+        return self.inspector
+
+
+class FakeCeleryApp:
+    def __init__(self, inspector):
+        self.control = FakeControl(inspector)
+
+
+class FakeJobsManager:
+    def __init__(self, *, counts=None, exc=None):
+        self.counts = counts or {}
+        self.exc = exc
+        self.calls = 0
+
+    def count_finished_since(self, since):
+        self.calls += 1
+        if self.exc:
+            raise self.exc
+        return self.counts
+
+
+DEPTHS = {
+    "scraping_agent_scrape_high": 2,
+    "scraping_agent_scrape_medium": 5,
+    "scraping_agent_scrape_low": 40,
+}
+
+
+@pytest.fixture
+def capacity(monkeypatch):
+    monkeypatch.setattr(capacity_route, "_cache", {"snapshot": None, "expires_at": 0.0})
+    monkeypatch.setattr(capacity_route, "THROUGHPUT_WINDOW_SECONDS", 600)
+    monkeypatch.setattr(capacity_route, "redis_client", FakeRedis(DEPTHS))
+    monkeypatch.setattr(
+        capacity_route,
+        "celery_app",
+        FakeCeleryApp(FakeInspect(active={"worker@a": [{"id": "1"}, {"id": "2"}], "worker@b": []})),
+    )
+    job_manager = FakeJobsManager(counts={"completed": 25, "failed": 5})
+    monkeypatch.setattr(capacity_route, "job_manager", job_manager)
+    return job_manager
+
+
+@pytest.mark.unit
+def test_get_capacity_reports_queues_workers_and_throughput(capacity):
+    response = capacity_route.get_capacity()
+
+    assert response["queues"] == {"high": 2, "medium": 5, "low": 40}
+    assert response["queued"] == 47
+    assert response["workers"] == 2
+    assert response["active_tasks"] == 2
+    assert response["throughput"] == {
+        "window_seconds": 600,
+        "completed": 25,
+        "failed": 5,
+        "per_minute": 3.0,
+    }
+
+
+@pytest.mark.unit
+def test_get_capacity_reuses_snapshot_within_cache_window(capacity):
+    first = capacity_route.get_capacity()
+    second = capacity_route.get_capacity()
+
+    assert second is first
+    assert capacity.calls == 1
+
+
+@pytest.mark.unit
+def test_get_capacity_nulls_parts_that_cannot_be_read(capacity, monkeypatch):
+    monkeypatch.setattr(
+        capacity_route,
+        "celery_app",
+        FakeCeleryApp(FakeInspect(exc=RuntimeError("broker unavailable"))),
+    )
+    monkeypatch.setattr(
+        capacity_route,
+        "job_manager",
+        FakeJobsManager(exc=RuntimeError("mongo unavailable")),
+    )
+
+    response = capacity_route.get_capacity()
+
+    assert response["queued"] == 47
+    assert response["workers"] is None
+    assert response["active_tasks"] is None
+    assert response["throughput"] is None
+
+
+@pytest.mark.unit
+def test_get_capacity_returns_503_when_queue_depth_unavailable(capacity, monkeypatch):
+    monkeypatch.setattr(
+        capacity_route,
+        "redis_client",
+        FakeRedis(exc=redis.ConnectionError("redis unavailable")),
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        capacity_route.get_capacity()
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.detail == "Failed to read queue depths"
+    assert capacity_route._cache["snapshot"] is None
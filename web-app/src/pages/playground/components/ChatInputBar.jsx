@@ -3,6 +3,8 @@ import { apiFetch } from "@/api/env";
 import { useAuth } from "@/auth/AuthContext";
 
 const IMAGE_GENERATION_ALLOWED_ROLE = "super_user";
+const GENERATION_POLL_INTERVAL_MS = 2000;
+const GENERATION_POLL_TIMEOUT_MS = 3 * 60 * 1000;
 
 const noticeStyles = {
     success: "border-emerald-200 bg-emerald-50 text-emerald-800",
@@ -19,6 +21,32 @@ async function readErrorDetail(response) {
     }
 }
 
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function waitForGeneration(taskId, token) {
+    const deadline = Date.now() + GENERATION_POLL_TIMEOUT_MS;
+
+    while (Date.now() < deadline) {
+        await sleep(GENERATION_POLL_INTERVAL_MS);
+
+        const response = await apiFetch(`/api/image_generations/${taskId}/`, {
+            headers: {
+                Authorization: `Bearer ${token}`,
+            },
+        });
+        if (!response.ok) {
+            throw new Error(`Status check failed with ${response.status}`);
+        }
+
+        const task = await response.json();
+        if (task.status === "completed" || task.status === "failed") {
+            return task;
+        }
+    }
+
+    throw new Error("Timed out waiting for image generation");
+}
+
 function ChatInputBar({ setImageGenerations, selectedProducts }) {
     const [value, setValue] = useState("");
     const [loading, setLoading] = useState(false);
@@ -97,10 +125,14 @@ function ChatInputBar({ setImageGenerations, selectedProducts }) {
                 return;
             }
 
-            const result = await genRes.json();
+            const queuedTask = await genRes.json();
+            // Identical earlier requests come back completed straight away.
+            const task = queuedTask.status === "completed"
+                ? queuedTask
+                : await waitForGeneration(queuedTask.id, token);
 
-            if ("status" in result) {
-                console.error("Generation failed:", result);
+            if (task.status !== "completed" || !task.generation) {
+                console.error("Generation failed:", task);
                 setNotice({
                     type: "error",
                     message: "Image generation failed before completion. No credits were charged.",
@@ -108,7 +140,7 @@ function ChatInputBar({ setImageGenerations, selectedProducts }) {
                 return;
             }
 
-            setImageGenerations((prev) => [...prev, result]);
+            setImageGenerations((prev) => [...prev, task.generation]);
             setValue("");
             setNotice({
                 type: "success",